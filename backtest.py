@@ -2,6 +2,8 @@ import json
 import yfinance as yf
 from datetime import datetime, timedelta
 
+from pipeline import bs, rates
+
 
 def backtest_top9(top9_file, historical_expiry=False):
     with open(top9_file, 'r') as f:
@@ -27,11 +29,24 @@ def backtest_top9(top9_file, historical_expiry=False):
                 'ticker': ticker,
                 'type': type_,
                 'profitable': profitable,
-                'expiry_price': expiry_price
+                'expiry_price': expiry_price,
+                'model_pop': model_pop(spread)
             })
 
     win_rate = sum(r['profitable'] for r in results) / len(results) * 100 if results else 0
     print(f"Win Rate: {win_rate}%")
+    modelled = [r['model_pop'] for r in results if r['model_pop'] is not None]
+    if modelled:
+        print(f"Expected (Black-Scholes PoP): {sum(modelled) / len(modelled):.1f}%")
+
+
+def model_pop(spread):
+    """PoP at entry from the shared Black-Scholes kernel, None if the spread lacks IV"""
+    if not spread.get('short_iv') or 'stock_price' not in spread:
+        return None
+    dte = spread['expiration']['dte']
+    return float(bs.pop(spread['stock_price'], spread['short_strike'], bs.years(dte),
+                        spread['short_iv'] / 100, rates.rate(dte), spread['type'] == 'Bear Call'))
 
 
 if __name__ == "__main__":
@@ -2,29 +2,35 @@
 Get S&P 500 from GitHub CSV
 """
 import pandas as pd
-import json
+import sys
+import os
 import requests
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts, cassette
+
 def get_sp500():
     url = 'https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv'
     try:
         # Use requests with default SSL verification
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
+        status, text = cassette.get_text('github', url, timeout=10)
+        if status != 200:  # Raise exception for bad status codes
+            raise requests.HTTPError(f"HTTP {status} for {url}")
         # Convert response to DataFrame
         from io import StringIO
-        df = pd.read_csv(StringIO(response.text))
+        df = pd.read_csv(StringIO(text))
         tickers = df['Symbol'].tolist()
         return tickers
     except requests.exceptions.SSLError as ssl_err:
         print(f"SSL Error: {ssl_err}")
         print("Attempting to fetch with SSL verification disabled...")
         # Fallback: Disable SSL verification (not recommended for production)
-        response = requests.get(url, timeout=10, verify=False)
-        response.raise_for_status()
+        status, text = cassette.get_text('github', url, timeout=10, verify=False)
+        if status != 200:
+            raise requests.HTTPError(f"HTTP {status} for {url}")
         from io import StringIO
-        df = pd.read_csv(StringIO(response.text))
+        df = pd.read_csv(StringIO(text))
         tickers = df['Symbol'].tolist()
         return tickers
     except Exception as e:
@@ -40,12 +46,11 @@ def main():
         tickers = get_sp500()
         print(f"Got {len(tickers)} tickers")
 
-        with open("data/sp500.json", "w") as f:
-            json.dump({
-                "timestamp": datetime.now().isoformat(),
-                "count": len(tickers),
-                "tickers": tickers
-            }, f, indent=2)
+        artifacts.save("data/sp500.json", {
+            "timestamp": datetime.now().isoformat(),
+            "count": len(tickers),
+            "tickers": tickers
+        })
 
         print("Step 0A complete")
     except Exception as e:
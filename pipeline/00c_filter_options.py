@@ -1,33 +1,25 @@
 """
 Filter by options availability
 """
-import json
 import sys
 import os
 from datetime import datetime, timedelta
-import requests
-import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.config import TRADIER_TOKEN
-
-base_url = 'https://api.tradier.com'
-headers = {'Authorization': f'Bearer {TRADIER_TOKEN}', 'Accept': 'application/json'}
+from pipeline import artifacts, tradier, response_cache, chain_store, cassette
 
 def process_ticker(stock_data):
     ticker = stock_data['ticker']
-    today = datetime.now().date()
+    today = cassette.now().date()
     try:
         # Get expirations
-        resp = requests.get(f'{base_url}/v1/markets/options/expirations', params={'symbol': ticker}, headers=headers)
-        if resp.status_code != 200:
+        try:
+            exps = chain_store.get_expirations(ticker, "00c")
+        except tradier.TradierError:
             return None, {'ticker': ticker, 'reason': 'no chain'}
-
-        exp_data = resp.json().get('expirations')
-        if not exp_data:
+        if not exps:
             return None, {'ticker': ticker, 'reason': 'no chain'}
-        exps = exp_data.get('date', []) if isinstance(exp_data, dict) else [e['date'] for e in exp_data]
 
         good_exps = []
         for exp_str in exps:
@@ -43,11 +35,10 @@ def process_ticker(stock_data):
         best_exp_str = good_exps[0]['date']
 
         # Fetch chain
-        resp_chain = requests.get(f'{base_url}/v1/markets/options/chains', params={'symbol': ticker, 'expiration': best_exp_str}, headers=headers)
-        if resp_chain.status_code != 200:
+        try:
+            chain_data = chain_store.get_chain(ticker, best_exp_str, "00c")
+        except tradier.TradierError:
             return None, {'ticker': ticker, 'reason': 'no chain'}
-
-        chain_data = resp_chain.json().get('options', {}).get('option', [])
         if not chain_data:
             return None, {'ticker': ticker, 'reason': 'no chain'}
 
@@ -68,28 +59,32 @@ def filter_options():
     print("STEP 0C: Filter Options")
     print("="*60)
 
-    with open("data/filter1_passed.json", "r") as f:
-        stocks = json.load(f)
+    stocks = artifacts.load("data/filter1_passed.json")
 
     print(f"Input: {len(stocks)} stocks")
 
     passed = []
     failed = []
+    cache_start = response_cache.stats()
 
-    with ThreadPoolExecutor(max_workers=10) as executor:  # Safe under 120/min
+    with ThreadPoolExecutor(max_workers=tradier.MAX_WORKERS) as executor:
         futures = [executor.submit(process_ticker, stock_data) for stock_data in stocks]
-        for future in concurrent.futures.as_completed(futures):
+        # Submission order, not completion order, so the output (and every
+        # request built from it downstream) is the same on each run
+        for future in futures:
             pass_item, fail_item = future.result()
             if pass_item:
                 passed.append(pass_item)
             if fail_item:
                 failed.append(fail_item)
 
+    print(f"  {response_cache.report(cache_start)}")
+    print(f"  {chain_store.report('00c')}")
     return passed, failed
 
 def save_results(passed, failed):
-    with open('data/filter2_passed.json', 'w') as f:
-        json.dump(passed, f, indent=2)
+    artifacts.save('data/filter2_passed.json', passed)
+    artifacts.save('data/filter2_failed.json', failed)
 
     print(f"\nResults:")
     print(f"  Passed: {len(passed)}")
@@ -1,19 +1,12 @@
 """
 Filter by IV - real strikes only
 """
-import json
 import sys
 import os
-from datetime import datetime
-import requests
-import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.config import TRADIER_TOKEN
-
-base_url = 'https://api.tradier.com'
-headers = {'Authorization': f'Bearer {TRADIER_TOKEN}', 'Accept': 'application/json'}
+from pipeline import artifacts, tradier, response_cache, chain_store, quotes
 
 def process_ticker(stock_data):
     ticker = stock_data['ticker']
@@ -21,29 +14,32 @@ def process_ticker(stock_data):
     stock_price = stock_data['mid']
     try:
         # Fetch chain for the best expiration
-        resp_chain = requests.get(f'{base_url}/v1/markets/options/chains', params={'symbol': ticker, 'expiration': exp_date_str}, headers=headers)
-        if resp_chain.status_code != 200:
+        try:
+            chain_data = chain_store.get_chain(ticker, exp_date_str, "00d")
+        except tradier.TradierError:
             return None, {'ticker': ticker, 'reason': 'expiration not in chain'}
-
-        chain_data = resp_chain.json().get('options', {}).get('option', [])
         if not chain_data:
             return None, {'ticker': ticker, 'reason': 'expiration not in chain'}
 
         # Find calls
-        calls = [opt for opt in chain_data if opt['option_type'] == 'call']
+        calls = [opt for opt in chain_data if opt.option_type == 'call']
         if not calls:
             return None, {'ticker': ticker, 'reason': 'no calls found'}
 
         # Find ATM call
-        atm_call = min(calls, key=lambda x: abs(x['strike'] - stock_price))
-        strike_price = atm_call['strike']
+        atm_call = min(calls, key=lambda x: abs(x.strike - stock_price))
+        strike_price = atm_call.strike
 
         # Build streamer_symbol equivalent (Tradier option symbol)
         exp_date_clean = exp_date_str.replace('-', '')
         strike_int = int(strike_price * 1000)
         symbol = f"{ticker}{exp_date_clean[2:]}C{strike_int:08d}"
 
-        return {'symbol': symbol, 'stock_data': stock_data}, None
+        # Chains carry greeks, so the ATM IV is usually already here
+        greek_data = tradier.greeks_record(atm_call)
+        iv = greek_data['iv'] if greek_data else None
+
+        return {'symbol': symbol, 'stock_data': stock_data, 'iv': iv}, None
     except Exception as e:
         return None, {'ticker': ticker, 'reason': str(e)[:30]}
 
@@ -52,8 +48,7 @@ def get_iv_data():
     print("STEP 0D: Filter IV")
     print("="*60)
 
-    with open("data/filter2_passed.json", "r") as f:
-        stocks = json.load(f)
+    stocks = artifacts.load("data/filter2_passed.json")
 
     print(f"Input: {len(stocks)} stocks")
 
@@ -61,39 +56,35 @@ def get_iv_data():
     failed = []
     symbols_to_check = []
     symbol_map = {}  # Initialize here
+    collected = {}
+    cache_start = response_cache.stats()
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    with ThreadPoolExecutor(max_workers=tradier.MAX_WORKERS) as executor:
         futures = [executor.submit(process_ticker, stock_data) for stock_data in stocks]
-        for future in concurrent.futures.as_completed(futures):
+        # Submission order, not completion order, so the output (and every
+        # request built from it downstream) is the same on each run
+        for future in futures:
             sym_item, fail_item = future.result()
             if sym_item:
-                symbols_to_check.append(sym_item['symbol'])
+                if sym_item['iv']:
+                    collected[sym_item['symbol']] = sym_item['iv']
+                else:
+                    symbols_to_check.append(sym_item['symbol'])
                 symbol_map[sym_item['symbol']] = sym_item['stock_data']
             if fail_item:
                 failed.append(fail_item)
 
-    # Now get Greeks/IV in batches
-    collected = {}
-    batch_size = 20
-    for i in range(0, len(symbols_to_check), batch_size):
-        batch = symbols_to_check[i:i+batch_size]
-        params = {'symbols': ','.join(batch), 'greeks': 'true'}
-        resp = requests.get(f'{base_url}/v1/markets/quotes', params=params, headers=headers)
-
-        if resp.status_code == 200:
-            quotes_data = resp.json().get('quotes', {})
-            data = quotes_data.get('quote', []) 
-            if not isinstance(data, list):
-                data = [data] if data else []
-
-            for opt in data:
-                if not opt or 'symbol' not in opt:
-                    continue
-                sym = opt['symbol']
-                greeks = opt.get('greeks', {})
-                volatility = greeks.get('mid_iv', 0.0)
-                if volatility > 0:
-                    collected[sym] = volatility
+    print(f"  {response_cache.report(cache_start)}")
+    print(f"  {chain_store.report('00d')}")
+
+    # Now get Greeks/IV in one bulk snapshot for anything the chain lacked
+    if symbols_to_check:
+        snapshot, _, batches = quotes.fetch_snapshot(symbols_to_check, greeks=True)
+        print(f"  {quotes.report(batches)}")
+        for sym, opt in snapshot.items():
+            volatility = opt.greeks.mid_iv if opt.greeks else 0.0
+            if volatility > 0:
+                collected[sym] = volatility
 
     # Process results
     for symbol, stock_data in symbol_map.items():
@@ -117,8 +108,8 @@ def get_iv_data():
     return passed, failed
 
 def save_results(passed, failed):
-    with open("data/filter3_passed.json", "w") as f:
-        json.dump(passed, f, indent=2)
+    artifacts.save("data/filter3_passed.json", passed)
+    artifacts.save("data/filter3_failed.json", failed)
 
     print(f"\nResults:")
     print(f"  Passed: {len(passed)}")
@@ -1,16 +1,18 @@
 """
 Select final 22 stocks
 """
-import json
-from datetime import datetime
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts
 
 def select_top_22():
     print("="*60)
     print("STEP 0E: Select 22 Stocks")
     print("="*60)
     
-    with open("data/filter3_passed.json", "r") as f:
-        stocks = json.load(f)
+    stocks = [dict(s) for s in artifacts.load("data/filter3_passed.json")]
     
     print(f"Input: {len(stocks)} stocks")
     
@@ -60,15 +62,12 @@ def select_top_22():
     # Save to stocks.py
     tickers = [s['ticker'] for s in selected]
     
-    with open("data/stocks.py", "w") as f:
-        f.write(f"# Generated {datetime.now()}\n")
-        f.write(f"STOCKS = {tickers}\n")
+    artifacts.save_stocks(tickers, "Generated")
     
     return selected
 
 def save_results(selected):
-    with open('data/filter4_passed.json', 'w') as f:
-        json.dump(selected, f, indent=2)
+    artifacts.save('data/filter4_passed.json', selected)
     
     print(f"\nSelected {len(selected)} stocks")
     print(f"\nTop 5:")
@@ -2,7 +2,6 @@
 Step 1B: Get Finnhub News
 Collects news for stocks picked in Step 1
 """
-import json
 import sys
 import os
 from datetime import datetime, timedelta
@@ -10,6 +9,7 @@ import finnhub
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import FINNHUB_API_KEY
+from pipeline import artifacts, cassette
 
 def get_news_for_stocks():
     """Get 3 days of news for selected stocks"""
@@ -18,10 +18,10 @@ def get_news_for_stocks():
     print("="*60)
     
     # Load stocks from Step 1
-    from data.stocks import STOCKS
+    STOCKS = artifacts.load_stocks()["STOCKS"]
     
     # Date range
-    today = datetime.now().date()
+    today = cassette.now().date()
     three_days_ago = today - timedelta(days=3)
     
     print(f"\n📰 Fetching news for {len(STOCKS)} stocks")
@@ -35,11 +35,13 @@ def get_news_for_stocks():
         print(f"[{i}/{len(STOCKS)}] {ticker}...", end=" ")
         
         try:
-            news = client.company_news(
-                ticker, 
-                _from=str(three_days_ago), 
-                to=str(today)
-            )
+            # Keyed on the window, not the dates, so a replay on a later day still matches
+            news = cassette.call('finnhub', {'endpoint': 'company_news', 'symbol': ticker, 'days': 3},
+                                 lambda: client.company_news(
+                                     ticker,
+                                     _from=str(three_days_ago),
+                                     to=str(today)
+                                 ))
             
             if news:
                 all_news[ticker] = {
@@ -80,8 +82,7 @@ def get_news_for_stocks():
         'news_data': all_news
     }
     
-    with open('data/finnhub_news.json', 'w') as f:
-        json.dump(output, f, indent=2)
+    artifacts.save('data/finnhub_news.json', output)
     
     print(f"\n✅ News collection complete!")
     print(f"   Total stocks: {len(STOCKS)}")
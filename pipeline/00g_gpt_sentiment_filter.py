@@ -1,6 +1,8 @@
 """
 Step 0G: GPT Sentiment Pre-Filter
-Analyzes news and removes high-risk stocks
+Analyzes news and flags high-risk stocks
+Writes data/sentiment_filtered.json; step 06 drops the removed tickers, so
+prices, chains and Greeks can be fetched while this step runs
 """
 import json
 import sys
@@ -10,6 +12,7 @@ from openai import OpenAI
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OPENAI_API_KEY
+from pipeline import artifacts, cassette
 
 def analyze_news_sentiment():
     """Use GPT to filter out risky stocks"""
@@ -18,8 +21,7 @@ def analyze_news_sentiment():
     print("="*60)
     
     # Load news
-    with open('data/finnhub_news.json', 'r') as f:
-        news_data = json.load(f)
+    news_data = artifacts.load('data/finnhub_news.json')
     
     stocks_with_news = news_data['news_data']
     
@@ -65,17 +67,17 @@ OUTPUT JSON:
     # Call GPT
     client = OpenAI(api_key=OPENAI_API_KEY)
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    request = {
+        "model": "gpt-4o-mini",
+        "messages": [
             {"role": "system", "content": "You filter stocks for credit spread safety. Output JSON only."},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.3,
-        max_tokens=500
-    )
-    
-    content = response.choices[0].message.content
+        "temperature": 0.3,
+        "max_tokens": 500
+    }
+    content = cassette.call('openai', request,
+                            lambda: client.chat.completions.create(**request).choices[0].message.content)
     
     # Parse response
     try:
@@ -103,17 +105,20 @@ OUTPUT JSON:
             for ticker, reason in remove_tickers.items():
                 print(f"      {ticker}: {reason}")
         
-        # Update stocks.py with filtered list
-        with open('data/stocks.py', 'w') as f:
-            f.write(f"# Filtered by sentiment analysis: {datetime.now()}\n")
-            f.write(f"STOCKS = {keep_tickers}\n\n")
-            f.write(f"REMOVED_STOCKS = {remove_tickers}\n")
-        
-        print(f"\n✅ Updated data/stocks.py with {len(keep_tickers)} safe stocks")
-        
     except Exception as e:
         print(f"❌ Parse error: {e}")
         print("Keeping all stocks as fallback")
+        keep_tickers = list(stocks_with_news)
+        remove_tickers = {}
+    
+    artifacts.save('data/sentiment_filtered.json', {
+        'timestamp': datetime.now().isoformat(),
+        'stocks': list(stocks_with_news),
+        'keep': keep_tickers,
+        'remove': remove_tickers
+    })
+    
+    print(f"\n✅ Saved data/sentiment_filtered.json with {len(keep_tickers)} safe stocks")
 
 if __name__ == "__main__":
     analyze_news_sentiment()
@@ -2,19 +2,15 @@
 Get Stock Prices: Real prices from Tradier
 Enhanced with better error handling and diagnostics
 """
-import json
 import sys
 import os
 from datetime import datetime
-import requests
 import yfinance as yf  # Add
 
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pipeline.config import TRADIER_TOKEN
-
-base_url = 'https://api.tradier.com'
-headers = {'Authorization': f'Bearer {TRADIER_TOKEN}', 'Accept': 'application/json'}
+from pipeline import artifacts, quotes
 
 def check_prerequisites():
     """Check if everything is set up correctly"""
@@ -29,20 +25,18 @@ def check_prerequisites():
         print("📁 Creating data directory...")
         os.makedirs("data", exist_ok=True)
 
-    # Try to import stocks
-    try:
-        sys.path.insert(0, 'data')
-        from stocks import STOCKS
+    # Load stocks
+    STOCKS = artifacts.load_stocks().get("STOCKS")
+    if STOCKS is not None:
         if not STOCKS:
             print("❌ data/stocks.py is empty")
             sys.exit(1)
         return STOCKS
-    except ImportError:
+    else:
         print("❌ data/stocks.py not found - trying sp500.json as fallback")
         # Fallback to sp500.json
         try:
-            with open("data/sp500.json", "r") as f:
-                data = json.load(f)
+            data = artifacts.load("data/sp500.json")
             stocks = data.get("tickers", [])
             if not stocks:
                 print("❌ data/sp500.json is empty or missing tickers")
@@ -76,44 +70,32 @@ def get_real_prices():
     else:
     # Existing live code
         try:
-            # Batch stocks, 50 at a time (as in 02_get_stock_prices.py)
-            batch_size = 50
-            for i in range(0, len(STOCKS), batch_size):
-                batch = STOCKS[i:i + batch_size]
-                symbols_str = ','.join(batch)
-                print(f"   Processing batch {i//batch_size + 1}: {len(batch)} stocks")
-
-                response = requests.get(f'{base_url}/v1/markets/quotes', params={'symbols': symbols_str}, headers=headers)
-
-                if response.status_code == 200:
-                    data = response.json()['quotes']
-                    quotes = data['quote'] if isinstance(data, dict) else data
-                    if not isinstance(quotes, list):
-                        quotes = [quotes] if quotes else []
-
-                    for q in quotes:
-                        if q is None or 'symbol' not in q:
-                            continue
-                        ticker = q['symbol']
-                        bid = float(q.get('bid', 0))
-                        ask = float(q.get('ask', 0))
-
-                        if bid > 0 and ask > 0:
-                            mid = (bid + ask) / 2
-                            prices[ticker] = {
-                                "bid": round(bid, 2),
-                                "ask": round(ask, 2),
-                                "mid": round(mid, 2),
-                                "spread": round(ask - bid, 2),
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            print(f"   ✅ {ticker}: ${mid:.2f} (bid: ${bid:.2f}, ask: ${ask:.2f})")
-                        else:
-                            failed.append(ticker)
-                            print(f"   ❌ {ticker}: No valid bid/ask")
+            # One bulk snapshot for every stock
+            snapshot, api_failed, batches = quotes.fetch_snapshot(STOCKS)
+            print(f"   {quotes.report(batches)}")
+            for batch in batches:
+                if batch["error"]:
+                    print(f"❌ Error fetching batch: {batch['error']}")
+            failed.extend(api_failed)
+
+            for q in snapshot.values():
+                ticker = q.symbol
+                bid = q.bid
+                ask = q.ask
+
+                if bid > 0 and ask > 0:
+                    mid = (bid + ask) / 2
+                    prices[ticker] = {
+                        "bid": round(bid, 2),
+                        "ask": round(ask, 2),
+                        "mid": round(mid, 2),
+                        "spread": round(ask - bid, 2),
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    print(f"   ✅ {ticker}: ${mid:.2f} (bid: ${bid:.2f}, ask: ${ask:.2f})")
                 else:
-                    print(f"❌ Error fetching batch {i//batch_size + 1}: {response.text[:100]}")
-                    failed.extend(batch)
+                    failed.append(ticker)
+                    print(f"   ❌ {ticker}: No valid bid/ask")
         except Exception as e:
             print(f"❌ Tradier connection error: {e}")
             print("This could be:")
@@ -144,8 +126,7 @@ def save_prices(prices, failed):
         "missing_tickers": failed
     }
 
-    with open("data/stock_prices.json", "w") as f:
-        json.dump(output, f, indent=2)
+    artifacts.save("data/stock_prices.json", output)
 
     print(f"\n📊 Results:")
     if len(STOCKS) > 0:
@@ -1,97 +1,60 @@
 """
 Get Options Chains - Complete with symbols for Greeks matching
+With INLINE_GREEKS the greeks in the chain payload are kept as
+call_greeks/put_greeks, so step 04 only merges instead of re-requesting them.
+With PRUNE_ILLIQUID contracts failing the liquidity rules are dropped here,
+so no later step quotes, solves or pairs them.
 """
-import json
 import sys
 import os
-from datetime import datetime, timedelta
-import requests
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.config import TRADIER_TOKEN
+from pipeline import artifacts, tradier, chain_fetcher, response_cache, chain_store, liquidity, snapshot
 
-base_url = 'https://api.tradier.com'
-headers = {'Authorization': f'Bearer {TRADIER_TOKEN}', 'Accept': 'application/json'}
+INLINE_GREEKS = True
+PRUNE_ILLIQUID = True
+# Payload fields kept per side for the liquidity rules
+LIQUIDITY_FIELDS = ("open_interest", "volume", "bidsize", "asksize")
 
 def load_stock_prices():
     try:
-        with open("data/stock_prices.json", "r") as f:
-            data = json.load(f)
+        data = artifacts.load("data/stock_prices.json")
         return data["prices"]
     except FileNotFoundError:
         print("❌ stock_prices.json not found")
         sys.exit(1)
 
-def process_ticker(ticker, price_data):
-    stock_price = price_data["mid"]
-    today = datetime.now().date()
-    try:
-        # Get expirations
-        resp = requests.get(f'{base_url}/v1/markets/options/expirations', params={'symbol': ticker}, headers=headers)
-        if resp.status_code != 200:
-            print(f"   ❌ {ticker}: Error getting expirations: {resp.text}")
-            return None
-
-        exp_data = resp.json().get('expirations')
-        if not exp_data:
-            print(f"   ❌ {ticker}: No options chain")
-            return None
-        exps = exp_data.get('date', []) if isinstance(exp_data, dict) else [e['date'] for e in exp_data]
-
-        ticker_expirations = []
-
-        for exp_date in exps:
-            exp = datetime.strptime(exp_date, '%Y-%m-%d').date()
-            dte = (exp - today).days
-            if 0 <= dte <= 45:
-                # Fetch chain for this expiration
-                resp_chain = requests.get(f'{base_url}/v1/markets/options/chains', params={'symbol': ticker, 'expiration': exp_date}, headers=headers)
-                if resp_chain.status_code != 200:
-                    print(f"   ❌ {ticker} ({exp_date}): Error getting chain: {resp_chain.text}")
-                    continue
-
-                chain_data = resp_chain.json().get('options', {}).get('option', [])
-                if not chain_data:
-                    print(f"   ❌ {ticker} ({exp_date}): Empty chain")
-                    continue
-
-                strikes = {}
-                for opt in chain_data:
-                    strike = opt['strike']
-                    if strike not in strikes:
-                        strikes[strike] = {'strike': strike}
-
-                    # Store the actual symbol and quotes
-                    exp_date_clean = exp_date.replace('-', '')
-                    strike_int = int(strike * 1000)
-                    symbol = f"{ticker}{exp_date_clean[2:]}{'C' if opt['option_type'] == 'call' else 'P'}{strike_int:08d}"
-
-                    if opt['option_type'] == 'call':
-                        strikes[strike]['call_symbol'] = symbol
-                        strikes[strike]['call_bid'] = float(opt.get('bid', 0))
-                        strikes[strike]['call_ask'] = float(opt.get('ask', 0))
-                    else:
-                        strikes[strike]['put_symbol'] = symbol
-                        strikes[strike]['put_bid'] = float(opt.get('bid', 0))
-                        strikes[strike]['put_ask'] = float(opt.get('ask', 0))
-
-                if strikes:
-                    ticker_expirations.append({
-                        'expiration_date': exp_date,
-                        'dte': dte,
-                        'strikes': sorted(list(strikes.values()), key=lambda x: x['strike'])
-                    })
-
-        if ticker_expirations:
-            print(f"   ✅ {ticker}: {len(ticker_expirations)} expirations")
-            return {ticker: ticker_expirations}
-        else:
-            return None
-    except Exception as e:
-        print(f"   ❌ {ticker}: {e}")
-        return None
+def build_strikes(ticker, exp_date, chain_data):
+    """Sorted strike dicts, plus the liquidity mask and per-rule rejections for chain_data"""
+    strikes = {}
+    liquid, rejected = liquidity.evaluate(liquidity.columns(chain_data))
+    for opt, ok in zip(chain_data, liquid.tolist()):
+        if PRUNE_ILLIQUID and not ok:
+            continue
+        strike = opt.strike
+        if strike not in strikes:
+            strikes[strike] = {'strike': strike}
+
+        # Store the actual symbol and quotes
+        exp_date_clean = exp_date.replace('-', '')
+        strike_int = int(strike * 1000)
+        symbol = f"{ticker}{exp_date_clean[2:]}{'C' if opt.option_type == 'call' else 'P'}{strike_int:08d}"
+
+        side = opt.option_type
+        strikes[strike][f'{side}_symbol'] = symbol
+        strikes[strike][f'{side}_bid'] = opt.bid
+        strikes[strike][f'{side}_ask'] = opt.ask
+        for field in LIQUIDITY_FIELDS:
+            strikes[strike][f'{side}_{field}'] = getattr(opt, field)
+
+        # Same contracts step 04 would ask greeks for: bid > 0 with an IV
+        if INLINE_GREEKS and strikes[strike][f'{side}_bid'] > 0:
+            greek_data = tradier.greeks_record(opt)
+            if greek_data:
+                strikes[strike][f'{side}_greeks'] = greek_data
+
+    return sorted(list(strikes.values()), key=lambda x: x['strike']), liquid, rejected
 
 def get_chains():
     print("="*60)
@@ -101,14 +64,47 @@ def get_chains():
     prices = load_stock_prices()
 
     chains = {}
+    counts = {"kept": 0, "pruned": 0, "rejected": {}}
+    cache_start = response_cache.stats()
     print("\n📊 Collecting chains with symbols...")
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(process_ticker, ticker, price_data) for ticker, price_data in prices.items()]
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                chains.update(result)
+    # Each (ticker, expiration) is its own task; chains land here as they arrive
+    def on_chain(ticker, exp_date, dte, chain_data):
+        if not chain_data:
+            print(f"   ❌ {ticker} ({exp_date}): Empty chain")
+            return
+        try:
+            strikes, liquid, rejected = build_strikes(ticker, exp_date, chain_data)
+        except Exception as e:
+            print(f"   ❌ {ticker} ({exp_date}): {e}")
+            return
+        if PRUNE_ILLIQUID:
+            counts["kept"] += int(liquid.sum())
+            counts["pruned"] += int((~liquid).sum())
+            for rule, n in rejected.items():
+                counts["rejected"][rule] = counts["rejected"].get(rule, 0) + n
+        else:
+            counts["kept"] += len(chain_data)
+        if strikes:
+            chains.setdefault(ticker, []).append({
+                'expiration_date': exp_date,
+                'dte': dte,
+                'strikes': strikes
+            })
+
+    def on_error(ticker, exp_date, error):
+        if exp_date is None and error is None:
+            print(f"   ❌ {ticker}: No options chain")
+        elif exp_date is None:
+            print(f"   ❌ {ticker}: Error getting expirations: {error}")
+        else:
+            print(f"   ❌ {ticker} ({exp_date}): Error getting chain: {error}")
+
+    chain_fetcher.fetch_chains(list(prices), 0, 45, on_chain, on_error, stage="02")
+
+    for ticker, ticker_expirations in chains.items():
+        ticker_expirations.sort(key=lambda x: x['expiration_date'])
+        print(f"   ✅ {ticker}: {len(ticker_expirations)} expirations")
 
     # Save complete chains with symbols
     total_exp = sum(len(exps) for exps in chains.values())
@@ -120,16 +116,26 @@ def get_chains():
         "success": len(chains),
         "total_expirations": total_exp,
         "total_strikes": total_strikes,
+        "contracts_kept": counts["kept"],
+        "contracts_pruned": counts["pruned"],
+        "liquidity_rejections": counts["rejected"],
         "chains": chains
     }
 
-    with open("data/chains.json", "w") as f:
-        json.dump(output, f, indent=2)
+    artifacts.save("data/chains.npz", output)
+    snapshot.write("data/chains.snap", chains, timestamp=output["timestamp"])
 
     print(f"\n{'='*60}")
     print(f"✅ Chains complete: {len(chains)}/{len(prices)} stocks")
     print(f"   Expirations: {total_exp}")
     print(f"   Strikes: {total_strikes} (with symbols)")
+    print(f"   Liquidity: kept {counts['kept']} contracts, pruned {counts['pruned']}")
+    if counts["rejected"]:
+        print("   Rejected by rule: " + ", ".join(f"{rule} {n}" for rule, n in counts["rejected"].items()))
+    stats = tradier.limiter.stats()
+    print(f"   {response_cache.report(cache_start)}")
+    print(f"   {chain_store.report('02')}")
+    print(f"   Tradier: {stats['requests']} requests, {stats['throttled']} throttled, concurrency {stats['concurrency']}")
 
 def main():
     get_chains()
@@ -1,96 +1,85 @@
 """
-FIXED Liquidity Checker - Works with multiple expirations
-Processes ALL expirations from chains.json
+Liquidity Checker - every strike of every expiration judged in one pass
+The chain snapshot step 02 wrote is mapped, its call and put columns
+(bid, ask, open interest, volume, sizes) are stacked, and the rules in
+pipeline/liquidity.py run once over every contract the chains list, with
+a rejection count per rule. Sides a strike does not list are left out, so
+they never show up as checked or rejected.
 """
-import json
-import asyncio
+import sys
+import os
 from datetime import datetime
 
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts, liquidity, snapshot
+
+SIDES = ("call", "put")
+
 def load_chains():
-    """Load chains data"""
+    """Map the chain snapshot"""
     try:
-        with open("data/chains.json", "r") as f:
-            return json.load(f)
+        return snapshot.load("data/chains.snap")
     except FileNotFoundError:
-        print("❌ chains.json not found")
+        print("❌ chains.snap not found")
         return None
 
-async def check_option_liquidity():
+def pack(records):
+    """(listed mask, liquidity.FIELDS columns) with the calls of every strike, then the puts"""
+    listed = np.concatenate([records[f"{side}_listed"] for side in SIDES])
+    return listed, {field: np.concatenate([records[f"{side}_{field}"] for side in SIDES]).astype(float)
+                    for field in liquidity.FIELDS}
+
+def check_option_liquidity():
     """Check liquidity for all options with multiple expirations"""
     print("💧 Checking liquidity for ALL expirations...")
-    
-    chains_data = load_chains()
-    if not chains_data or not chains_data.get("chains"):
+
+    snap = load_chains()
+    if snap is None or not snap.index:
         print("❌ No chains to check")
         return {}
-    
+
+    records = snap.records
+    listed, cols = pack(records)
+    liquid = np.zeros(len(listed), dtype=bool)
+    liquid[listed], rejected = liquidity.evaluate({field: col[listed] for field, col in cols.items()})
+    side_liquid = liquid.reshape(len(SIDES), len(records))
+    any_liquid = side_liquid.any(axis=0)
+
     liquid_chains = {}
     total_liquid_options = 0
-    
-    for ticker, expirations_list in chains_data["chains"].items():
-        print(f"\n{ticker}: Checking liquidity...")
-        
-        ticker_liquid_exps = []
-        
-        # Process each expiration
-        for exp_data in expirations_list:
-            exp_date = exp_data["expiration_date"]
-            dte = exp_data["dte"]
-            strikes = exp_data["strikes"]
-            
-            liquid_strikes = []
-            
-            for strike_data in strikes:
-                strike = strike_data["strike"]
-                
-                # Calculate liquidity score for calls
-                call_bid = strike_data.get("call_bid", 0)
-                call_ask = strike_data.get("call_ask", 0)
-                call_mid = (call_bid + call_ask) / 2 if call_ask > 0 else 0
-                call_spread = call_ask - call_bid if call_ask > call_bid else float('inf')
-                call_spread_pct = (call_spread / call_mid * 100) if call_mid > 0 else float('inf')
-                
-                # Calculate liquidity score for puts  
-                put_bid = strike_data.get("put_bid", 0)
-                put_ask = strike_data.get("put_ask", 0)
-                put_mid = (put_bid + put_ask) / 2 if put_ask > 0 else 0
-                put_spread = put_ask - put_bid if put_ask > put_bid else float('inf')
-                put_spread_pct = (put_spread / put_mid * 100) if put_mid > 0 else float('inf')
-                
-                # Liquidity criteria
-                call_liquid = (call_mid >= 0.30 and call_spread_pct < 10)
-                put_liquid = (put_mid >= 0.30 and put_spread_pct < 10)
-                
-                if call_liquid or put_liquid:
-                    liquid_strikes.append({
-                        "strike": strike,
-                        "call_bid": call_bid,
-                        "call_ask": call_ask,
-                        "call_liquid": call_liquid,
-                        "put_bid": put_bid,
-                        "put_ask": put_ask,
-                        "put_liquid": put_liquid
-                    })
-            
-            if liquid_strikes:
-                ticker_liquid_exps.append({
-                    "expiration_date": exp_date,
-                    "dte": dte,
-                    "strikes": liquid_strikes
-                })
-                total_liquid_options += len(liquid_strikes)
-        
+    for ticker, expiration, dte, start, stop in snap.index:
+        keep = np.flatnonzero(any_liquid[start:stop]) + start
+        if not keep.size:
+            continue
+        columns = {"strike": records["strike"][keep].tolist()}
+        for k, side in enumerate(SIDES):
+            for field in ("bid", "ask", "open_interest", "volume"):
+                columns[f"{side}_{field}"] = records[f"{side}_{field}"][keep].tolist()
+            columns[f"{side}_liquid"] = side_liquid[k, keep].tolist()
+        names = list(columns)
+        liquid_chains.setdefault(ticker, []).append({
+            "expiration_date": expiration,
+            "dte": dte,
+            "strikes": [dict(zip(names, row)) for row in zip(*columns.values())]
+        })
+        total_liquid_options += len(keep)
+
+    for ticker in dict.fromkeys(entry[0] for entry in snap.index):
+        ticker_liquid_exps = liquid_chains.get(ticker)
         if ticker_liquid_exps:
-            liquid_chains[ticker] = ticker_liquid_exps
             total_strikes = sum(len(e["strikes"]) for e in ticker_liquid_exps)
-            print(f"   ✅ {len(ticker_liquid_exps)} expirations with {total_strikes} liquid strikes")
+            print(f"   ✅ {ticker}: {len(ticker_liquid_exps)} expirations with {total_strikes} liquid strikes")
         else:
-            print(f"   ❌ No liquid options")
-    
+            print(f"   ❌ {ticker}: No liquid options")
+
     return {
         "timestamp": datetime.now().isoformat(),
         "tickers_with_liquidity": len(liquid_chains),
         "total_liquid_options": total_liquid_options,
+        "contracts_checked": int(listed.sum()),
+        "rejections": rejected,
         "chains": liquid_chains
     }
 
@@ -99,16 +88,17 @@ def main():
     print("="*60)
     print("STEP 03: Check Liquidity")
     print("="*60)
-    
-    liquid_chains = asyncio.run(check_option_liquidity())
-    
+
+    liquid_chains = check_option_liquidity()
+
     # Save results
-    with open("data/liquid_chains.json", "w") as f:
-        json.dump(liquid_chains, f, indent=2)
-    
+    artifacts.save("data/liquid_chains.npz", liquid_chains)
+
     print(f"\n✅ Liquidity check complete")
     print(f"   Tickers with liquid options: {liquid_chains.get('tickers_with_liquidity', 0)}")
     print(f"   Total liquid options: {liquid_chains.get('total_liquid_options', 0)}")
+    if liquid_chains.get("rejections"):
+        print("   Rejected by rule: " + ", ".join(f"{rule} {n}" for rule, n in liquid_chains["rejections"].items()))
 
 if __name__ == "__main__":
     main()
@@ -1,133 +1,174 @@
 """
-Get Greeks - Using exact symbols from chains.json for data connectivity
+Get Greeks - Using exact symbols from chains.npz for data connectivity
+Works on chains.npz as columns and chains.snap as records, so the nested
+chain dicts are never rebuilt here.
+By default IV and greeks are solved locally from each contract's bid/ask
+mid (pipeline/iv_solver.py), one batch over the mapped chain snapshot; chain
+greeks from step 02 only fill in contracts whose mid has no IV.
+GREEKS_SOURCE=tradier keeps Tradier's greeks instead: those step 02 took
+from the chain payload are merged, and only contracts still missing them
+are requested from the quotes endpoint.
 """
-import json
 import sys
 import os
 from datetime import datetime
-import requests
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pipeline.config import TRADIER_TOKEN
-
-base_url = 'https://api.tradier.com'
-headers = {'Authorization': f'Bearer {TRADIER_TOKEN}', 'Accept': 'application/json'}
-
-def fetch_greeks_batch(batch):
-    params = {'symbols': ','.join(batch), 'greeks': 'true'}
-    resp = requests.get(f'{base_url}/v1/markets/quotes', params=params, headers=headers)
-    batch_greeks = {}
-    if resp.status_code == 200:
-        data = resp.json().get('quotes', {}).get('quote', [])
-        if not isinstance(data, list):
-            data = [data] if data else []
-
-        for opt in data:
-            if not opt or 'symbol' not in opt:
-                continue
-            symbol = opt['symbol']
-            greeks = opt.get('greeks', {})
-            iv = float(greeks.get('mid_iv', 0))
-            if iv > 0:
-                batch_greeks[symbol] = {
-                    "iv": round(iv, 4),
-                    "delta": round(float(greeks.get('delta', 0)), 4),
-                    "theta": round(float(greeks.get('theta', 0)), 4),
-                    "gamma": round(float(greeks.get('gamma', 0)), 6),
-                    "vega": round(float(greeks.get('vega', 0)), 4)
-                }
-    return batch_greeks
+from pipeline import artifacts, columnar, tradier, quotes, rates, iv_solver, bs, snapshot
+
+# "local" solves greeks from mids; "tradier" uses the API's greeks
+GREEKS_SOURCE = os.environ.get("GREEKS_SOURCE", "local")
+
+# greeks_record keys, in its order; stored as greeks.* columns in chains tables
+GREEKS = ("iv", "delta", "theta", "gamma", "vega")
+
+def table_column(table, name, missing):
+    """One column of a chains table, with missing where a contract lacks the field"""
+    if f"col:{name}" not in table and f"codes:{name}" not in table:
+        return np.full(int(table.get("_rows", 0)), missing)
+    values = columnar.column(table, name)
+    if f"mask:{name}" in table:
+        values = np.where(table[f"mask:{name}"], values, missing)
+    return values
+
+def present(table, name):
+    """Which contracts of a chains table have the field"""
+    if f"mask:{name}" in table:
+        return table[f"mask:{name}"]
+    return np.full(int(table.get("_rows", 0)), f"col:{name}" in table or f"codes:{name}" in table)
+
+def strike_rows(table):
+    """Chain snapshot row of each contract: a strike's sides are adjacent rows of the table"""
+    if not table:
+        return np.zeros(0, dtype=int)
+    new = np.zeros(int(table["_rows"]), dtype=bool)
+    new[0] = True
+    for key in ("ticker", "expiration_date", "strike"):
+        values = columnar.column(table, key)
+        new[1:] |= values[1:] != values[:-1]
+    return np.cumsum(new) - 1
+
+def set_greeks(values, found, k, record):
+    """Store a greeks record as contract k's greeks"""
+    for leaf in GREEKS:
+        values[leaf][k] = record[leaf]
+    found[k] = True
+
+def solve_local(snap, prices, rows, is_call):
+    """Greeks records (None where unsolved) for the contracts at snapshot rows, solved in one batch"""
+    tickers, _, dtes = snap.row_keys()
+    solved = [None] * len(rows)
+    priced = np.array([ticker in prices for ticker in tickers[rows].tolist()], dtype=bool)
+    if not priced.any():
+        return solved
+    rows, is_call = rows[priced], is_call[priced]
+    records = snap.records[rows]
+    mid = np.where(is_call, records["call_bid"] + records["call_ask"], records["put_bid"] + records["put_ask"]) / 2
+    S = np.array([prices[ticker]["mid"] for ticker in tickers[rows].tolist()])
+    days, inverse = np.unique(dtes[rows], return_inverse=True)
+    r = np.array([rates.rate(int(d)) for d in days])[inverse]
+    records = iv_solver.greeks_records(mid, S, records["strike"], bs.years(dtes[rows]), r, is_call)
+    for k, record in zip(np.flatnonzero(priced).tolist(), records):
+        solved[k] = record
+    return solved
+
+def with_greeks(table, need, values, found):
+    """The chains table with the greeks.* columns of the contracts at need replaced"""
+    has = present(table, "greeks.iv").copy()
+    has[need] = found
+    out = {name: array for name, array in table.items()
+           if not name.partition(":")[2].startswith("greeks.")}
+    names = [name for name in table.get("_columns", np.zeros(0, dtype=str)).tolist()
+             if not name.startswith("greeks.")]
+    if has.any():
+        for leaf in GREEKS:
+            column = table_column(table, f"greeks.{leaf}", np.nan).astype(float)
+            column[need] = values[leaf]
+            out[f"col:greeks.{leaf}"] = np.where(has, column, np.nan)
+            if not has.all():
+                out[f"mask:greeks.{leaf}"] = has
+        names += [f"greeks.{leaf}" for leaf in GREEKS]
+    if table:
+        out["_columns"] = np.array(names, dtype=str)
+    return out
 
 def get_connected_greeks():
     print("="*60)
     print("STEP 04: Get Greeks")
     print("="*60)
 
-    with open("data/chains.json", "r") as f:
-        chains_data = json.load(f)
+    header, table = artifacts.load_table("data/chains.npz")
+    snap = snapshot.load("data/chains.snap")
+    local = GREEKS_SOURCE != "tradier"
 
     print("\n🧮 Collecting Greeks for exact chain strikes...")
 
-    all_symbols = []
-    symbol_map = {}
-
-    for ticker, expirations in chains_data["chains"].items():
-        for exp_idx, exp_data in enumerate(expirations):
-            exp_date = exp_data["expiration_date"].replace('-', '')
-            for strike_idx, strike in enumerate(exp_data["strikes"]):
-                if strike.get("call_symbol") and strike.get("call_bid", 0) > 0:
-                    symbol = strike["call_symbol"]
-                    all_symbols.append(symbol)
-                    symbol_map[symbol] = {
-                        "ticker": ticker,
-                        "exp_idx": exp_idx,
-                        "strike_idx": strike_idx,
-                        "type": "call",
-                        "strike": strike["strike"]
-                    }
-
-                if strike.get("put_symbol") and strike.get("put_bid", 0) > 0:
-                    symbol = strike["put_symbol"]
-                    all_symbols.append(symbol)
-                    symbol_map[symbol] = {
-                        "ticker": ticker,
-                        "exp_idx": exp_idx,
-                        "strike_idx": strike_idx,
-                        "type": "put",
-                        "strike": strike["strike"]
-                    }
+    # Contracts that need greeks: listed with a symbol and a bid
+    rows = strike_rows(table)
+    if (rows[-1] + 1 if len(rows) else 0) != len(snap.records):
+        raise ValueError("data/chains.snap does not match data/chains.npz; rerun step 02")
+    symbols = table_column(table, "symbol", "")
+    need = np.flatnonzero((symbols != "") & (table_column(table, "bid", 0) > 0))
+    all_symbols = symbols[need].tolist()
+    is_call = table_column(table, "side", "")[need] == "call"
 
-    print(f"📊 Need Greeks for {len(all_symbols)} options")
+    # Greeks step 02 took from the chain payload, per needed contract
+    found = present(table, "greeks.iv")[need].copy()
+    values = {leaf: table_column(table, f"greeks.{leaf}", np.nan)[need].astype(float) for leaf in GREEKS}
 
-    all_greeks = {}
-    BATCH_SIZE = 20
-
-    batches = [all_symbols[i:i + BATCH_SIZE] for i in range(0, len(all_symbols), BATCH_SIZE)]
-
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = [executor.submit(fetch_greeks_batch, batch) for batch in batches]
-        for future in concurrent.futures.as_completed(futures):
-            batch_greeks = future.result()
-            all_greeks.update(batch_greeks)
-            coverage = len(batch_greeks) / BATCH_SIZE * 100 if BATCH_SIZE else 0
-            print(f"      ✅ {len(batch_greeks)} Greeks ({coverage:.1f}%)")
-
-    # Add Greeks back to chains structure for connectivity
-    chains_with_greeks = chains_data.copy()
-
-    for symbol, greek_data in all_greeks.items():
-        if symbol in symbol_map:
-            loc = symbol_map[symbol]
-            ticker = loc["ticker"]
-            exp_idx = loc["exp_idx"]
-            strike_idx = loc["strike_idx"]
-            opt_type = loc["type"]
-
-            if opt_type == "call":
-                chains_with_greeks["chains"][ticker][exp_idx]["strikes"][strike_idx]["call_greeks"] = greek_data
-            else:
-                chains_with_greeks["chains"][ticker][exp_idx]["strikes"][strike_idx]["put_greeks"] = greek_data
-
-    # Save connected data
-    total_coverage = len(all_greeks) / len(all_symbols) * 100 if all_symbols else 0
-
-    output = {
-        "timestamp": datetime.now().isoformat(),
-        "total_options": len(all_symbols),
-        "greeks_collected": len(all_greeks),
-        "coverage": round(total_coverage, 1),
-        "chains_with_greeks": chains_with_greeks["chains"]  # Chains with Greeks embedded
-    }
-
-    with open("data/chains_with_greeks.json", "w") as f:
-        json.dump(output, f, indent=2)
+    print(f"📊 Need Greeks for {len(all_symbols)} options")
+    if "contracts_pruned" in header["meta"]:
+        print(f"   Pruned as illiquid in step 02: {header['meta']['contracts_pruned']}")
+    to_fetch = []
+    if local:
+        prices = artifacts.load("data/stock_prices.json")["prices"]
+        solved = solve_local(snap, prices, rows[need], is_call)
+        kept = sum(1 for k, record in enumerate(solved) if record is None and found[k])
+        print(f"   Solved locally from mids: {sum(1 for record in solved if record)} | Kept from chains: {kept}")
+        for k, record in enumerate(solved):
+            if record:
+                set_greeks(values, found, k, record)
+    else:
+        to_fetch = [all_symbols[k] for k in np.flatnonzero(~found).tolist()]
+        print(f"   From chains: {int(found.sum())} | To fetch: {len(to_fetch)}")
+
+    if to_fetch:
+        quoted, _, batches = quotes.fetch_snapshot(to_fetch, greeks=True)
+        position = {symbol: k for k, symbol in enumerate(all_symbols)}
+        fetched = 0
+        for symbol, opt in quoted.items():
+            greek_data = tradier.greeks_record(opt)
+            if greek_data and symbol in position:
+                set_greeks(values, found, position[symbol], greek_data)
+                fetched += 1
+        coverage = fetched / len(to_fetch) * 100
+        print(f"      ✅ {fetched} Greeks ({coverage:.1f}%)")
+        print(f"   {quotes.report(batches)}")
+
+    # Add Greeks back as new columns and records (step 02's artifacts may be shared in memory)
+    collected = int(found.sum())
+    total_coverage = collected / len(all_symbols) * 100 if all_symbols else 0
+    timestamp = datetime.now().isoformat()
+
+    artifacts.save_table("data/chains_with_greeks.npz", with_greeks(table, need, values, found),
+                         timestamp=timestamp,
+                         total_options=len(all_symbols),
+                         greeks_collected=collected,
+                         coverage=round(total_coverage, 1),
+                         source="local" if local else "tradier")
+
+    records = np.array(snap.records)
+    for side, on_side in (("call", is_call), ("put", ~is_call)):
+        for leaf in GREEKS:
+            records[f"{side}_{leaf}"][rows[need][on_side]] = np.where(found, values[leaf], np.nan)[on_side]
+    snapshot.write_records("data/chains_with_greeks.snap", records, snap.index, timestamp=timestamp)
 
     print(f"\n{'='*60}")
-    print(f"✅ Greeks collected and connected: {len(all_greeks)}/{len(all_symbols)}")
+    print(f"✅ Greeks collected and connected: {collected}/{len(all_symbols)}")
     print(f"   Coverage: {total_coverage:.1f}%")
-    print(f"   Saved to: chains_with_greeks.json")
+    print(f"   Saved to: chains_with_greeks.npz, chains_with_greeks.snap")
 
 def main():
     get_connected_greeks()
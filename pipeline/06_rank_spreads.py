@@ -1,44 +1,44 @@
 """
 Rank Spreads: One spread per ticker only
+Drops tickers the 00G sentiment filter removed from the current selection
 """
-import json
 import sys
+import os
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts, ranker
+
 def rank_spreads():
     print("="*60)
     print("STEP 6: Rank Spreads (1 per ticker)")
     print("="*60)
     
-    with open("data/spreads.json", "r") as f:
-        data = json.load(f)
+    data = artifacts.load("data/spreads.npz")
     spreads = data["spreads"]
     
+    # Apply the sentiment filter if it ran on the current stock selection
+    try:
+        sentiment = artifacts.load("data/sentiment_filtered.json")
+    except FileNotFoundError:
+        sentiment = None
+    if sentiment and set(sentiment["stocks"]) == set(artifacts.load_stocks().get("STOCKS", [])):
+        keep = set(sentiment["keep"])
+        removed = len([s for s in spreads if s["ticker"] not in keep])
+        spreads = [s for s in spreads if s["ticker"] in keep]
+        print(f"\n📰 Sentiment filter: {removed} spreads removed ({len(sentiment['remove'])} tickers flagged)")
+    
     print(f"\n🏆 Ranking {len(spreads)} spreads...")
     
-    # Add score = (ROI × PoP) / 100
+    # Best per ticker by score = (ROI × PoP) / 100
+    rank = ranker.Ranker(per_ticker=1)
     for spread in spreads:
-        spread["score"] = round((spread["roi"] * spread["pop"]) / 100, 1)
-        
-        # Decision logic
-        if spread["pop"] >= 70 and spread["roi"] >= 20:
-            spread["decision"] = "ENTER"
-        elif spread["pop"] >= 60 and spread["roi"] >= 30:
-            spread["decision"] = "WATCH"
-        else:
-            spread["decision"] = "SKIP"
-    
-    # Sort by score
-    spreads.sort(key=lambda x: x["score"], reverse=True)
+        rank.push(spread)
+    unique_spreads = [dict(s) for s in rank.ranked()]  # Step 05's spreads stay untouched
     
-    # Keep only BEST per ticker
-    seen_tickers = set()
-    unique_spreads = []
-    
-    for spread in spreads:
-        if spread["ticker"] not in seen_tickers:
-            seen_tickers.add(spread["ticker"])
-            unique_spreads.append(spread)
+    for spread in unique_spreads:
+        spread["score"] = ranker.score(spread)
+        spread["decision"] = ranker.decision(spread)
     
     # Add rank
     for i, spread in enumerate(unique_spreads):
@@ -62,8 +62,7 @@ def rank_spreads():
         "watch_list": watch
     }
     
-    with open("data/ranked_spreads.json", "w") as f:
-        json.dump(output, f, indent=2)
+    artifacts.save("data/ranked_spreads.json", output)
     
     print(f"\n📊 Results (1 per ticker):")
     print(f"   🟢 ENTER: {len(enter)}")
@@ -2,27 +2,23 @@
 """
 Build Report Table: Top 9 spreads for GPT analysis
 """
-import json
 import sys
 import os
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts
 
 def build_report_table():
     print("="*60)
     print("STEP 7: Build Report (Top 9)")
     print("="*60)
     
-    with open("data/ranked_spreads.json", "r") as f:
-        data = json.load(f)
+    data = artifacts.load("data/ranked_spreads.json")
     
     spreads = data["ranked_spreads"][:9]
     
-    try:
-        from data.stocks import EDGE_REASON
-    except ImportError:
-        EDGE_REASON = {}
+    EDGE_REASON = artifacts.load_stocks().get("EDGE_REASON", {})
     
     sector_map = {
         "INTC": "XLK", "AMD": "XLK", "AVGO": "XLK", "CEG": "XLU", "NVDA": "XLK",
@@ -70,8 +66,7 @@ def build_report_table():
         "report_table": report_entries
     }
     
-    with open("data/report_table.json", "w") as f:
-        json.dump(output, f, indent=2)
+    artifacts.save("data/report_table.json", output)
     
     print(f"\nReport: {len(report_entries)} trades")
     print(f"\n{'Rank':<5} {'Ticker':<8} {'Type':<12} {'ROI':<8} {'PoP':<8}")
@@ -2,13 +2,13 @@
 GPT Risk Analysis - 5W1H News Analysis + Heat Scores
 """
 import os
-import json
 import sys
 from datetime import datetime
 from openai import OpenAI
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OPENAI_API_KEY
+from pipeline import artifacts, bs, cassette, rates
 
 if not OPENAI_API_KEY:
     print("❌ Missing OPENAI_API_KEY")
@@ -17,16 +17,13 @@ if not OPENAI_API_KEY:
 def load_comprehensive_data():
     data = {}
     
-    with open("data/report_table.json", "r") as f:
-        data["trades"] = json.load(f)["report_table"]
+    data["trades"] = [dict(t) for t in artifacts.load("data/report_table.json")["report_table"]]
     
-    with open("data/stock_prices.json", "r") as f:
-        data["prices"] = json.load(f)["prices"]
+    data["prices"] = artifacts.load("data/stock_prices.json")["prices"]
     
     try:
-        with open("data/finnhub_news.json", "r") as f:
-            news = json.load(f)
-            data["news"] = news["news_data"]
+        news = artifacts.load("data/finnhub_news.json")
+        data["news"] = news["news_data"]
     except:
         data["news"] = {}
     
@@ -42,17 +39,19 @@ def load_comprehensive_data():
         
         if "current_price" in trade:
             current = trade["current_price"]
-            if "Put" in trade['type']:
-                trade["buffer_pct"] = ((current - trade["short_strike"]) / current * 100)
-            else:
-                trade["buffer_pct"] = ((trade["short_strike"] - current) / current * 100)
+            is_call = "Call" in trade['type']
+            trade["buffer_pct"] = float(bs.buffer_pct(current, trade["short_strike"], is_call))
+            if trade.get("iv") and trade.get("dte"):
+                dte = trade["dte"]
+                trade["touch_pct"] = float(bs.prob_touch(current, trade["short_strike"], bs.years(dte),
+                                                         trade["iv"] / 100, rates.rate(dte), is_call))
     
     return data
 
 def create_analysis_prompt(data):
     prompt = f"""Analyze 9 credit spreads with STRUCTURED NEWS ANALYSIS and HEAT SCORES.
 
-Date: {datetime.now().strftime('%Y-%m-%d')}
+Date: {cassette.now().strftime('%Y-%m-%d')}
 
 HEAT SCORE (1-10):
 1-3 = Low risk (no catalysts, stable news)
@@ -64,6 +63,7 @@ TRADES WITH NEWS:
     
     for i, trade in enumerate(data["trades"], 1):
         buffer = trade.get("buffer_pct", 0)
+        touch = f"{trade['touch_pct']:.1f}%" if "touch_pct" in trade else "N/A"
         current = trade.get("current_price", 0)
         roi = float(trade['roi'].rstrip('%'))
         pop = float(trade['pop'].rstrip('%'))
@@ -76,7 +76,7 @@ TRADES WITH NEWS:
 TRADE #{i}: {ticker} {trade['type']} {trade['legs']}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 METRICS:
-- Current: ${current:.2f} | Short Strike: ${trade['short_strike']:.0f} | Buffer: {buffer:.1f}%
+- Current: ${current:.2f} | Short Strike: ${trade['short_strike']:.0f} | Buffer: {buffer:.1f}% | Touch: {touch}
 - DTE: {dte} | ROI: {roi:.1f}% | PoP: {pop:.1f}% | Score: {score:.1f}
 
 NEWS (last 3 days):
@@ -139,20 +139,20 @@ def main():
     client = OpenAI(api_key=OPENAI_API_KEY)
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
+        request = {
+            "model": "gpt-4",
+            "messages": [
                 {
                     "role": "system",
                     "content": "You analyze credit spreads with structured 5W1H news analysis. Extract specific dates, events, entities from headlines and summaries. Assign risk heat scores 1-10."
                 },
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3,
-            max_tokens=3000
-        )
-        
-        analysis = response.choices[0].message.content
+            "temperature": 0.3,
+            "max_tokens": 3000
+        }
+        analysis = cassette.call('openai', request,
+                                 lambda: client.chat.completions.create(**request).choices[0].message.content)
         print("✅ Analysis complete\n")
         
         print("="*60)
@@ -160,12 +160,11 @@ def main():
         print("="*60)
         print(analysis)
         
-        with open("data/top9_analysis.json", "w") as f:
-            json.dump({
-                "timestamp": datetime.now().isoformat(),
-                "analysis": analysis,
-                "tickers": tickers
-            }, f, indent=2)
+        artifacts.save("data/top9_analysis.json", {
+            "timestamp": datetime.now().isoformat(),
+            "analysis": analysis,
+            "tickers": tickers
+        })
         
         print("\n✅ Saved to data/top9_analysis.json")
         
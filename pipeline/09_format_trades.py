@@ -1,15 +1,18 @@
 """
 Format Top 9 Trades with News Summary
 """
-import json
 import re
+import sys
+import os
 import subprocess
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts
+
 
 def load_data():
-    with open("data/top9_analysis.json", "r") as f:
-        return json.load(f)
+    return artifacts.load("data/top9_analysis.json")
 
 
 def is_weekly(exp_date_str):
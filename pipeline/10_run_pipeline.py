@@ -3,34 +3,33 @@
 Master Pipeline - Beautiful Data Flow
 Runs all 15 steps and shows the data cascade
 """
-import subprocess
 import sys
+import os
 import time
-import json
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts
+from pipeline.executor import STEPS, run_pipeline
+
 def print_header():
     print("\n" + "="*80)
     print("💎 CREDIT SPREAD FINDER - MASTER PIPELINE")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
 
-def run_step(num, script, description):
-    """Run step and show data flow"""
+def on_start(num, description):
+    """Show step banner"""
     print(f"\n{'─'*80}")
-    print(f"⚡ STEP {num}: {description}")
+    print(f"⚡ STEP {num.upper()}: {description}")
     print(f"{'─'*80}")
-    
-    start = time.time()
-    result = subprocess.run([sys.executable, script])
-    elapsed = time.time() - start
-    
-    if result.returncode == 0:
+
+def on_finish(num, description, ok, elapsed):
+    """Show step result"""
+    if ok:
         print(f"✅ Complete ({elapsed:.1f}s)")
-        return True
     else:
         print(f"❌ Failed ({elapsed:.1f}s)")
-        return False
 
 def show_flow():
     """Show data flow summary"""
@@ -39,43 +38,33 @@ def show_flow():
     print("="*80)
     
     try:
-        with open("data/sp500.json", "r") as f:
-            sp500 = json.load(f)
-            print(f"\n🎯 S&P 500: {len(sp500)} tickers")
+        sp500 = artifacts.load("data/sp500.json")
+        print(f"\n🎯 S&P 500: {len(sp500)} tickers")
         
-        with open("data/filter1_passed.json", "r") as f:
-            f1 = json.load(f)
-            pct1 = len(f1)/len(sp500)*100
-            print(f"   ↓ Price Filter: {len(f1)} passed ({pct1:.1f}%)")
+        f1 = artifacts.load("data/filter1_passed.json")
+        pct1 = len(f1)/len(sp500)*100
+        print(f"   ↓ Price Filter: {len(f1)} passed ({pct1:.1f}%)")
         
-        with open("data/filter2_passed.json", "r") as f:
-            f2 = json.load(f)
-            pct2 = len(f2)/len(f1)*100
-            print(f"   ↓ Options Filter: {len(f2)} passed ({pct2:.1f}%)")
+        f2 = artifacts.load("data/filter2_passed.json")
+        pct2 = len(f2)/len(f1)*100
+        print(f"   ↓ Options Filter: {len(f2)} passed ({pct2:.1f}%)")
         
-        with open("data/filter3_passed.json", "r") as f:
-            f3 = json.load(f)
-            pct3 = len(f3)/len(f2)*100
-            print(f"   ↓ IV Filter: {len(f3)} passed ({pct3:.1f}%)")
+        f3 = artifacts.load("data/filter3_passed.json")
+        pct3 = len(f3)/len(f2)*100
+        print(f"   ↓ IV Filter: {len(f3)} passed ({pct3:.1f}%)")
         
-        with open("data/stocks.py", "r") as f:
-            content = f.read()
-            import ast
-            stocks = ast.literal_eval(content.split("=")[1].split("\n")[0])
-            print(f"   ↓ Top Scored: {len(stocks)} selected")
+        stocks = artifacts.load_stocks()["STOCKS"]
+        print(f"   ↓ Top Scored: {len(stocks)} selected")
         
-        with open("data/spreads.json", "r") as f:
-            spreads = json.load(f)
-            print(f"\n📈 Spreads Built: {spreads['total_spreads']}")
+        spreads = artifacts.load("data/spreads.npz")
+        print(f"\n📈 Spreads Built: {spreads['total_spreads']}")
         
-        with open("data/ranked_spreads.json", "r") as f:
-            ranked = json.load(f)
-            print(f"   ↓ Ranked: {ranked['summary']['total']}")
-            print(f"   ↓ Top 22 (1 per ticker): {len(ranked['top_22'])}")
+        ranked = artifacts.load("data/ranked_spreads.json")
+        print(f"   ↓ Ranked: {ranked['summary']['total']}")
+        print(f"   ↓ Top 22 (1 per ticker): {len(ranked['top_22'])}")
         
-        with open("data/top9_analysis.json", "r") as f:
-            top9 = json.load(f)
-            print(f"\n🎯 Final Output: 9 trades ready")
+        top9 = artifacts.load("data/top9_analysis.json")
+        print(f"\n🎯 Final Output: 9 trades ready")
             
     except Exception as e:
         print(f"⚠️ Could not load summary: {e}")
@@ -83,32 +72,19 @@ def show_flow():
 def main():
     print_header()
     
-    steps = [
-        ("00A", "pipeline/00a_get_sp500.py", "Get S&P 500 tickers"),
-        ("00B", "pipeline/00b_filter_price.py", "Filter by price & spread"),
-        ("00C", "pipeline/00c_filter_options.py", "Filter by options chains"),
-        ("00D", "pipeline/00d_filter_iv.py", "Filter by IV range"),
-        ("00E", "pipeline/00e_select_22.py", "Score & select top 22"),
-        ("00F", "pipeline/00f_get_news.py", "Fetch news headlines"),
-        ("01", "pipeline/01_get_prices.py", "Get real-time prices"),
-        ("02", "pipeline/02_get_chains.py", "Get options chains"),
-        ("03", "pipeline/03_check_liquidity.py", "Check liquidity"),
-        ("04", "pipeline/04_get_greeks.py", "Collect Greeks"),
-        ("05", "pipeline/05_calculate_spreads.py", "Calculate spreads"),
-        ("06", "pipeline/06_rank_spreads.py", "Rank by score"),
-        ("07", "pipeline/07_build_report.py", "Build report table"),
-        ("08", "pipeline/08_gpt_analysis.py", "GPT 5W1H analysis"),
-        ("09", "pipeline/09_format_trades.py", "Format final trades")
-    ]
+    # Same run as before: every step except the 00G sentiment filter
+    steps = [s for s in STEPS if s[0] != "00g"]
     
-    pipeline_start = time.time()
-    failed_at = None
+    failures = []
+    
+    def on_step_finish(num, description, ok, elapsed):
+        on_finish(num, description, ok, elapsed)
+        if not ok:
+            failures.append(num.upper())
     
-    for num, script, desc in steps:
-        if not run_step(num, script, desc):
-            failed_at = num
-            break
-        time.sleep(0.5)
+    pipeline_start = time.time()
+    run_pipeline(steps, on_start=on_start, on_finish=on_step_finish)
+    failed_at = ", ".join(failures) if failures else None
     
     elapsed = time.time() - pipeline_start
     
@@ -0,0 +1,107 @@
+"""
+Artifact Store - hand step outputs between steps in memory
+Standalone scripts read and write data/*.json as before. The in-process
+executor turns on the memory store so each step gets the previous step's
+objects directly, and can switch the JSON files off entirely. Those objects
+are shared by every step that loads them, so a step copies whatever it
+changes instead of editing a loaded artifact in place.
+Paths in TABLES are columnar .npz files (pipeline/columnar.py); load()
+gives back the same dicts, load_table() the raw columns, and save_table()
+keeps a step's columns as they are until some step asks for dicts.
+"""
+import ast
+import json
+import os
+from datetime import datetime
+
+from pipeline import columnar
+
+# Columnar artifacts: path -> (table kind, key holding the table)
+TABLES = {
+    "data/chains.npz": ("chains", "chains"),
+    "data/liquid_chains.npz": ("chains", "chains"),
+    "data/chains_with_greeks.npz": ("chains", "chains_with_greeks"),
+    "data/spreads.npz": ("rows", "spreads"),
+}
+
+_memory = {}
+_tables = {}    # path -> (header, columns) from save_table(), decoded on first load()
+_settings = {"in_memory": False, "write": True}
+
+def configure(in_memory=False, write=True):
+    """Set how save() and load() behave for this process"""
+    _settings["in_memory"] = in_memory
+    _settings["write"] = write
+    _memory.clear()
+    _tables.clear()
+
+def load(path):
+    """Return the artifact at path, from memory when available"""
+    if path in _memory:
+        return _memory[path]
+    if path in _tables:
+        data = columnar.decode(*_tables.pop(path))
+    elif path in TABLES:
+        data = columnar.load(path)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f)
+    if _settings["in_memory"]:
+        _memory[path] = data
+    return data
+
+def save(path, data):
+    """Keep the artifact for later steps and write it unless disabled"""
+    if _settings["in_memory"]:
+        _memory[path] = data
+        _tables.pop(path, None)
+    if _settings["write"] or not _settings["in_memory"]:
+        if path in TABLES:
+            columnar.save(path, data, *TABLES[path])
+        else:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+
+def load_table(path):
+    """(header, columns) of a TABLES artifact, without building any dicts"""
+    if path in _tables:
+        return _tables[path]
+    if path in _memory:
+        return columnar.encode(_memory[path], *TABLES[path])
+    return columnar.load_arrays(path)
+
+def save_table(path, arrays, **meta):
+    """save() for a TABLES artifact given as columns, with meta as its other keys"""
+    kind, key = TABLES[path]
+    header = {"kind": kind, "key": key, "meta": meta}
+    if _settings["in_memory"]:
+        _tables[path] = (header, arrays)
+        _memory.pop(path, None)
+    if _settings["write"] or not _settings["in_memory"]:
+        columnar.save_arrays(path, header, arrays)
+
+def save_stocks(tickers, header, **extra):
+    """Write data/stocks.py (STOCKS plus any extra constants)"""
+    values = {"STOCKS": tickers, **extra}
+    if _settings["in_memory"]:
+        _memory["data/stocks.py"] = values
+    if _settings["write"] or not _settings["in_memory"]:
+        with open("data/stocks.py", "w") as f:
+            f.write(f"# {header}: {datetime.now()}\n")
+            for name, value in values.items():
+                f.write(f"{name} = {value!r}\n")
+
+def load_stocks():
+    """Read the constants in data/stocks.py without importing it"""
+    if "data/stocks.py" in _memory:
+        return _memory["data/stocks.py"]
+    values = {}
+    if os.path.exists("data/stocks.py"):
+        with open("data/stocks.py", "r") as f:
+            for line in f:
+                name, sep, value = line.partition("=")
+                if sep and name.strip().isidentifier():
+                    values[name.strip()] = ast.literal_eval(value.strip())
+    if _settings["in_memory"]:
+        _memory["data/stocks.py"] = values
+    return values
@@ -0,0 +1,71 @@
+"""
+Black-Scholes Kernel - batch pricing and probabilities for arrays of contracts
+Every function takes scalars or NumPy arrays for S (spot), K (strike),
+T (years), sigma (IV as a decimal) and r, broadcasts them together and
+returns arrays. The normal CDF is scipy.special.ndtr, the ufunc underneath
+scipy.stats.norm.cdf, without the distribution-object overhead.
+Probabilities are percentages, to match the spread dicts.
+"""
+import numpy as np
+from scipy.special import ndtr
+
+def years(dte):
+    return np.asarray(dte, dtype=float) / 365.0
+
+def d1_d2(S, K, T, sigma, r):
+    S, K, T, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        d2 = d1 - sigma * np.sqrt(T)
+    return d1, d2
+
+def _valid(T, sigma):
+    return (np.asarray(sigma) > 0) & (np.asarray(T) > 0)
+
+def pop(S, K, T, sigma, r, is_call):
+    """Probability (%) a short strike expires out of the money, 0 where T or sigma is 0"""
+    _, d2 = d1_d2(S, K, T, sigma, r)
+    p = ndtr(np.where(is_call, -d2, d2)) * 100
+    return np.where(_valid(T, sigma), p, 0.0)
+
+def prob_itm(S, K, T, sigma, r, is_call):
+    """Probability (%) a strike finishes in the money"""
+    return np.where(_valid(T, sigma), 100 - pop(S, K, T, sigma, r, is_call), 0.0)
+
+def prob_touch(S, K, T, sigma, r, is_call):
+    """Probability (%) the underlying trades through the strike before expiry
+
+    Reflection-principle estimate: twice the chance of finishing ITM, capped at 100.
+    """
+    return np.minimum(2 * prob_itm(S, K, T, sigma, r, is_call), 100.0)
+
+def price(S, K, T, sigma, r, is_call):
+    """Theoretical European option price"""
+    d1, d2 = d1_d2(S, K, T, sigma, r)
+    S, K, T = (np.asarray(x, dtype=float) for x in (S, K, T))
+    discount = np.exp(-r * T)
+    call = S * ndtr(d1) - K * discount * ndtr(d2)
+    put = K * discount * ndtr(-d2) - S * ndtr(-d1)
+    intrinsic = np.where(is_call, np.maximum(S - K, 0), np.maximum(K - S, 0))
+    return np.where(_valid(T, sigma), np.where(is_call, call, put), intrinsic)
+
+def greeks(S, K, T, sigma, r, is_call):
+    """delta, gamma, theta (per day) and vega (per vol point), Tradier's conventions"""
+    d1, d2 = d1_d2(S, K, T, sigma, r)
+    S, K, T, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, sigma))
+    pdf = np.exp(-0.5 * d1**2) / np.sqrt(2 * np.pi)
+    discount = np.exp(-r * T)
+    decay = -S * pdf * sigma / (2 * np.sqrt(T))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = pdf / (S * sigma * np.sqrt(T))
+    return {
+        "delta": np.where(is_call, ndtr(d1), ndtr(d1) - 1),
+        "gamma": gamma,
+        "theta": np.where(is_call, decay - r * K * discount * ndtr(d2), decay + r * K * discount * ndtr(-d2)) / 365,
+        "vega": S * pdf * np.sqrt(T) / 100,
+    }
+
+def buffer_pct(S, K, is_call):
+    """Distance (%) from spot to a short strike, positive while it is OTM"""
+    S, K = np.asarray(S, dtype=float), np.asarray(K, dtype=float)
+    return np.where(is_call, K - S, S - K) / S * 100
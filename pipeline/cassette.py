@@ -0,0 +1,191 @@
+"""
+Cassette - record and replay every network call the pipeline makes
+PIPELINE_NETWORK_MODE picks the mode:
+    live     (default) talk to the services directly
+    record   talk to them and write each request/response pair to the cassette
+    replay   answer from the cassette and never touch the network
+A cassette is one directory per run, data/cassettes/<YYYYmmdd-HHMMSS> unless
+PIPELINE_CASSETTE names one, with a <service>/<hash>.json file per request.
+Replay uses the newest cassette by default; Tradier chains and expirations
+missing from it fall back to the seed payloads checked into data/.cache,
+which live runs never overwrite.
+
+PIPELINE_REPLAY_LATENCY simulates the network on replay: a number of
+seconds per call, or "recorded" to sleep as long as the original call took.
+
+A recording also stores when it was made (clock.json). now() is the clock
+every step uses for "today" (DTE windows, news dates, prompt dates): the
+wall clock when live or recording, and the recording's clock on replay,
+so a replay on a later day asks for the same requests.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+MODE_ENV = "PIPELINE_NETWORK_MODE"
+DIR_ENV = "PIPELINE_CASSETTE"
+LATENCY_ENV = "PIPELINE_REPLAY_LATENCY"
+CASSETTE_ROOT = "data/cassettes"
+CLOCK_FILE = "clock.json"
+DIR_FORMAT = "%Y%m%d-%H%M%S"
+
+_counts = {"recorded": 0, "replayed": 0, "seeded": 0, "missed": 0}
+_lock = threading.Lock()
+_clock = {}     # replay: {"recorded_at": aware datetime, "started": time.time()}
+
+class CassetteMiss(Exception):
+    """Replay asked for a request the cassette never saw"""
+
+def mode():
+    return os.environ.get(MODE_ENV, "live")
+
+def start(new_mode, path=None, latency=None):
+    """Switch this process (and the steps it runs) to live/record/replay"""
+    os.environ[MODE_ENV] = new_mode
+    if path:
+        os.environ[DIR_ENV] = path
+    else:
+        os.environ.pop(DIR_ENV, None)
+    if latency is not None:
+        os.environ[LATENCY_ENV] = str(latency)
+    with _lock:
+        for name in _counts:
+            _counts[name] = 0
+        _clock.clear()
+
+def directory():
+    """Cassette directory for this run, chosen on first use"""
+    with _lock:
+        path = os.environ.get(DIR_ENV)
+        if path:
+            return path
+        if mode() == "replay":
+            runs = sorted(os.listdir(CASSETTE_ROOT)) if os.path.isdir(CASSETTE_ROOT) else []
+            if not runs:
+                raise CassetteMiss(f"no cassettes in {CASSETTE_ROOT}")
+            path = os.path.join(CASSETTE_ROOT, runs[-1])
+        else:
+            path = os.path.join(CASSETTE_ROOT, datetime.now().strftime(DIR_FORMAT))
+        os.environ[DIR_ENV] = path
+        return path
+
+def _recorded_at(path):
+    """When the cassette at path was recorded, from clock.json or its directory name"""
+    try:
+        with open(os.path.join(path, CLOCK_FILE), "r") as f:
+            return datetime.fromisoformat(json.load(f)["recorded_at"])
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        return datetime.strptime(os.path.basename(os.path.normpath(path)), DIR_FORMAT).astimezone()
+    except ValueError:
+        return None
+
+def _stamp_clock(path):
+    """Write clock.json the first time a cassette directory records"""
+    clock = os.path.join(path, CLOCK_FILE)
+    if not os.path.exists(clock):
+        os.makedirs(path, exist_ok=True)
+        with open(clock, "w") as f:
+            json.dump({"recorded_at": datetime.now().astimezone().isoformat()}, f)
+
+def now(tz=None):
+    """The pipeline's current time: the recording's clock on replay, the wall clock otherwise
+
+    Naive local time like datetime.now() unless tz is given. On replay the
+    recorded time advances with the wall clock from the first call.
+    """
+    if mode() == "replay":
+        path = directory()
+        with _lock:
+            if _clock.get("path") != path:
+                _clock.update(path=path, recorded_at=_recorded_at(path), started=time.time())
+            recorded_at, started = _clock["recorded_at"], _clock["started"]
+        if recorded_at is not None:
+            current = datetime.fromtimestamp(recorded_at.timestamp() + time.time() - started).astimezone()
+            return current.astimezone(tz) if tz else current.replace(tzinfo=None)
+    return datetime.now(tz)
+
+def _entry_path(service, request):
+    digest = hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+    return os.path.join(directory(), service, f"{digest}.json")
+
+def _simulate_latency(recorded):
+    latency = os.environ.get(LATENCY_ENV, "0")
+    seconds = recorded if latency == "recorded" else float(latency)
+    if seconds > 0:
+        time.sleep(seconds)
+
+def _count(name):
+    with _lock:
+        _counts[name] += 1
+
+def call(service, request, fetch, seed=None):
+    """Run fetch() for a JSON-serializable request, or replay its response
+
+    request identifies the call (url, params, body...); fetch() performs it
+    and returns JSON-serializable data. seed is an optional JSON file used
+    when replay finds no recording.
+    """
+    current = mode()
+    if current == "live":
+        return fetch()
+
+    path = _entry_path(service, request)
+    if current == "replay":
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            _count("replayed")
+            _simulate_latency(entry.get("seconds", 0))
+            return entry["response"]
+        except (OSError, ValueError, KeyError):
+            pass
+        if seed:
+            try:
+                with open(seed, "r") as f:
+                    response = json.load(f)
+                _count("seeded")
+                _simulate_latency(0)
+                return response
+            except (OSError, ValueError):
+                pass
+        _count("missed")
+        raise CassetteMiss(f"{service}: {json.dumps(request, sort_keys=True)[:120]} not recorded")
+
+    _stamp_clock(directory())
+    start_time = time.time()
+    response = fetch()
+    entry = {"request": request, "response": response, "seconds": round(time.time() - start_time, 4)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+    _count("recorded")
+    return response
+
+def get_text(service, url, timeout, verify=True):
+    """Plain HTTP GET through the cassette, returns (status_code, text)"""
+    def fetch():
+        resp = requests.get(url, timeout=timeout, verify=verify)
+        return [resp.status_code, resp.text]
+    status, text = call(service, {"url": url}, fetch)
+    return status, text
+
+def report():
+    """One-line summary of this run's cassette traffic"""
+    current = mode()
+    if current == "live":
+        return "Network: live"
+    with _lock:
+        counts = dict(_counts)
+    if current == "record":
+        return f"Network: recorded {counts['recorded']} calls to {os.environ.get(DIR_ENV)}"
+    return (f"Network: replayed {counts['replayed']} calls from {os.environ.get(DIR_ENV)}, "
+            f"{counts['seeded']} from the cache seed, {counts['missed']} missing")
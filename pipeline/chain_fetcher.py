@@ -0,0 +1,72 @@
+"""
+Chain Fetcher - every (ticker, expiration) chain request is its own task
+Expiration lookups and chain requests share one bounded pool, so a ticker
+with seven weeklies no longer holds a worker for eight serial round-trips.
+Chains are handed to the caller as they arrive, and chains an earlier
+stage already pulled in this snapshot come from the chain store.
+
+Requests run on the pooled, rate-limited Tradier client through asyncio's
+executor hooks rather than a separate async HTTP stack, so the quota and
+keep-alive pool stay shared with every other step.
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import tradier, chain_store, cassette
+
+async def _fetch_all(tickers, min_dte, max_dte, on_chain, on_error, concurrency, stage):
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    today = cassette.now().date()
+
+    def call(fn, *args):
+        return loop.run_in_executor(pool, fn, *args)
+
+    async def expirations(ticker):
+        try:
+            exps = await call(chain_store.get_expirations, ticker, stage)
+        except tradier.TradierError as e:
+            on_error(ticker, None, e)
+            return []
+        if not exps:
+            on_error(ticker, None, None)
+        wanted = []
+        for exp_date in exps:
+            dte = (datetime.strptime(exp_date, '%Y-%m-%d').date() - today).days
+            if min_dte <= dte <= max_dte:
+                wanted.append((ticker, exp_date, dte))
+        return wanted
+
+    async def chain(ticker, exp_date, dte):
+        try:
+            options = await call(chain_store.get_chain, ticker, exp_date, stage)
+        except tradier.TradierError as e:
+            on_error(ticker, exp_date, e)
+            return
+        on_chain(ticker, exp_date, dte, options)
+
+    try:
+        chain_tasks = []
+        for done in asyncio.as_completed([expirations(t) for t in tickers]):
+            for ticker, exp_date, dte in await done:
+                chain_tasks.append(asyncio.create_task(chain(ticker, exp_date, dte)))
+        if chain_tasks:
+            await asyncio.gather(*chain_tasks)
+    finally:
+        pool.shutdown(wait=False)
+
+def fetch_chains(tickers, min_dte, max_dte, on_chain, on_error=None, concurrency=None, stage=None):
+    """Fetch every chain between min_dte and max_dte for tickers
+
+    on_chain(ticker, expiration, dte, options) is called as each chain
+    arrives; on_error(ticker, expiration, error) on failures (expiration is
+    None when the expiration lookup itself failed or was empty). Lookups go
+    through the chain store, credited to `stage`.
+    """
+    asyncio.run(_fetch_all(tickers, min_dte, max_dte, on_chain,
+                           on_error or (lambda *args: None),
+                           concurrency or tradier.MAX_WORKERS, stage))
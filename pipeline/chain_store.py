@@ -0,0 +1,77 @@
+"""
+Chain Store - one copy of each chain per pipeline snapshot
+00c, 00d and 02 all want the same (ticker, expiration) chains. The executor
+starts a snapshot at the beginning of a run; any chain or expiration list
+fetched since then is reused by later stages, from memory or from the
+data/.cache/live payload, instead of going back to Tradier. Outside a snapshot
+(a step run on its own) lookups fall through to the TTL cache.
+"""
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import tradier, response_cache
+
+SNAPSHOT_ENV = "PIPELINE_SNAPSHOT"
+
+_store = {}
+_saved = defaultdict(int)
+_lock = threading.Lock()
+
+def begin_snapshot():
+    """Start a new snapshot; subprocesses inherit it through the environment"""
+    os.environ[SNAPSHOT_ENV] = datetime.now(response_cache.MARKET_TZ).isoformat()
+    with _lock:
+        _store.clear()
+        _saved.clear()
+
+def snapshot():
+    return os.environ.get(SNAPSHOT_ENV)
+
+def _from_disk(kind, ticker, key):
+    """Payload from data/.cache/live if it was fetched during this snapshot"""
+    try:
+        with open(response_cache.cache_path(kind, ticker, key), "r") as f:
+            payload = json.load(f)
+        if datetime.fromisoformat(payload["_fetched_at"]) >= datetime.fromisoformat(snapshot()):
+            return payload
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def _get(kind, ticker, key, stage, parse, fetch):
+    store_key = (kind, ticker, key, snapshot())
+    with _lock:
+        if store_key in _store:
+            _saved[stage] += 1
+            return _store[store_key]
+
+    value = None
+    if snapshot():
+        payload = _from_disk(kind, ticker, key)
+        if payload is not None:
+            value = parse(payload)
+            with _lock:
+                _saved[stage] += 1
+    if value is None:
+        value = fetch()
+
+    with _lock:
+        _store[store_key] = value
+    return value
+
+def get_expirations(ticker, stage):
+    return _get('expirations', ticker, 'exp', stage, tradier.expiration_dates,
+                lambda: tradier.fetch_expirations(ticker))
+
+def get_chain(ticker, expiration, stage):
+    return _get('chain', ticker, expiration, stage, tradier.options,
+                lambda: tradier.fetch_chain(ticker, expiration))
+
+def report(stage):
+    with _lock:
+        return f"Chain store: {_saved[stage]} requests saved"
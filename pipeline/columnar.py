@@ -0,0 +1,191 @@
+"""
+Columnar Artifacts - chains and spreads as NumPy .npz tables
+Chains are stored one row per contract (ticker, expiration, strike, side
+plus that side's fields), spreads one row per spread. Every column is a
+typed array; string columns are dictionary-encoded as int32 codes into a
+category array, so a ticker or expiration is stored once per file. Fields
+a row lacks are tracked with a presence mask, and nested dicts (greeks,
+expiration) are flattened to dotted column names. Everything else in the
+artifact (timestamps, counts) travels as a small JSON header.
+"""
+import json
+
+import numpy as np
+
+SIDES = ("call", "put")
+CHAIN_KEYS = ("ticker", "expiration_date", "dte", "strike", "side")
+_MISSING = object()
+
+def _flatten(d, prefix=""):
+    for key, value in d.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+def _unflatten(flat):
+    out = {}
+    for name, value in flat.items():
+        *parents, leaf = name.split(".")
+        node = out
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return out
+
+def encode_rows(rows):
+    """{array name: array} for a list of dicts with scalar or nested-dict values"""
+    by_name = {}
+    for k, row in enumerate(rows):
+        for name, value in _flatten(row):
+            by_name.setdefault(name, {})[k] = value
+    arrays = {"_columns": np.array(list(by_name), dtype=str), "_rows": np.array(len(rows))}
+    for name, cells in by_name.items():
+        complete = len(cells) == len(rows)
+        values = list(cells.values()) if complete else [cells.get(k) for k in range(len(rows))]
+        sample = next(iter(cells.values()))
+        if isinstance(sample, str):
+            cats, codes = np.unique(np.array(["" if v is None else v for v in values], dtype=str),
+                                    return_inverse=True)
+            arrays[f"codes:{name}"] = codes.astype(np.int32)
+            arrays[f"cats:{name}"] = cats
+        elif isinstance(sample, bool):
+            arrays[f"col:{name}"] = np.array([bool(v) for v in values])
+        elif all(type(v) is int for v in cells.values()):
+            arrays[f"col:{name}"] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+        else:
+            arrays[f"col:{name}"] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        if not complete:
+            present = np.zeros(len(rows), dtype=bool)
+            present[list(cells)] = True
+            arrays[f"mask:{name}"] = present
+    return arrays
+
+def column(arrays, name):
+    """One decoded column as a NumPy array (strings expanded from their codes)"""
+    if f"codes:{name}" in arrays:
+        return arrays[f"cats:{name}"][arrays[f"codes:{name}"]]
+    return arrays[f"col:{name}"]
+
+def _decoded_columns(arrays):
+    """(names, per-row value lists) with _MISSING where a row lacks the field
+
+    Dotted columns come back as one column per nested dict, holding the
+    dict itself.
+    """
+    names, columns, groups = [], [], {}
+    for name in arrays["_columns"].tolist():
+        values = column(arrays, name).tolist()
+        if f"mask:{name}" in arrays:
+            values = [v if p else _MISSING for v, p in zip(values, arrays[f"mask:{name}"].tolist())]
+        parent, dot, leaf = name.partition(".")
+        if not dot:
+            names.append(name)
+            columns.append(values)
+        elif parent in groups:
+            groups[parent].append((leaf, values))
+        else:
+            groups[parent] = [(leaf, values)]
+            names.append(parent)
+            columns.append(groups[parent])
+    for parent, members in groups.items():
+        leaves = [leaf for leaf, _ in members]
+        columns[names.index(parent)] = [
+            dict(zip(leaves, row)) if _MISSING not in row
+            else {leaf: v for leaf, v in zip(leaves, row) if v is not _MISSING} or _MISSING
+            for row in zip(*(values for _, values in members))]
+    return names, columns
+
+def _complete(arrays):
+    """Rows that have every column"""
+    complete = np.ones(int(arrays["_rows"]), dtype=bool)
+    for name in arrays:
+        if name.startswith("mask:"):
+            complete &= arrays[name]
+    return complete
+
+def decode_rows(arrays):
+    """Inverse of encode_rows"""
+    names, columns = _decoded_columns(arrays)
+    if not names:
+        return [{} for _ in range(int(arrays["_rows"]))]
+    return [dict(zip(names, row)) if ok else {n: v for n, v in zip(names, row) if v is not _MISSING}
+            for ok, row in zip(_complete(arrays).tolist(), zip(*columns))]
+
+def chain_rows(chains):
+    """{ticker: [expiration]} chains as one flat dict per contract"""
+    rows = []
+    for ticker, expirations in chains.items():
+        for exp_data in expirations:
+            for strike_data in exp_data["strikes"]:
+                for side in SIDES:
+                    prefix = f"{side}_"
+                    fields = {key[len(prefix):]: value for key, value in strike_data.items()
+                              if key.startswith(prefix)}
+                    if not fields:
+                        continue
+                    rows.append({"ticker": ticker, "expiration_date": exp_data["expiration_date"],
+                                 "dte": exp_data["dte"], "strike": strike_data["strike"],
+                                 "side": side, **fields})
+    return rows
+
+def chains_from_arrays(arrays):
+    """Inverse of chain_rows, straight from the encoded columns"""
+    names, columns = _decoded_columns(arrays)
+    if not names:
+        return {}
+    fields = [k for k, name in enumerate(names) if name not in CHAIN_KEYS]
+    keyed = {side: [f"{side}_{names[k]}" for k in fields] for side in SIDES}
+    values = [columns[k] for k in fields]
+    ticker, expiration, dte, strike, side = (columns[names.index(key)] for key in CHAIN_KEYS)
+    complete = _complete(arrays).tolist()
+
+    chains = {}
+    exp_data = strike_data = None
+    for k, row in enumerate(zip(*values)):
+        if exp_data is None or ticker[k] != ticker[k - 1] or expiration[k] != expiration[k - 1]:
+            exp_data = {"expiration_date": expiration[k], "dte": dte[k], "strikes": []}
+            chains.setdefault(ticker[k], []).append(exp_data)
+            strike_data = None
+        if strike_data is None or strike[k] != strike_data["strike"]:
+            strike_data = {"strike": strike[k]}
+            exp_data["strikes"].append(strike_data)
+        if complete[k]:
+            strike_data.update(zip(keyed[side[k]], row))
+        else:
+            strike_data.update({n: v for n, v in zip(keyed[side[k]], row) if v is not _MISSING})
+    return chains
+
+def encode(data, kind, key):
+    """(header, arrays) for data, with data[key] as a 'chains' or 'rows' table"""
+    body = data.get(key) or ({} if kind == "chains" else [])
+    rows = chain_rows(body) if kind == "chains" else list(body)
+    header = {"kind": kind, "key": key, "meta": {k: v for k, v in data.items() if k != key}}
+    return header, (encode_rows(rows) if rows else {})
+
+def save(path, data, kind, key):
+    """Write data to path as an uncompressed .npz"""
+    save_arrays(path, *encode(data, kind, key))
+
+def save_arrays(path, header, arrays):
+    """Write already encoded columns (as load_arrays returns them)"""
+    with open(path, "wb") as f:
+        np.savez(f, _header=np.array(json.dumps(header)), **arrays)
+
+def load_arrays(path):
+    """(header, {array name: array}) without rebuilding any dicts"""
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    return json.loads(str(arrays.pop("_header"))), arrays
+
+def load(path):
+    """The artifact save() wrote, as the same nested dicts"""
+    return decode(*load_arrays(path))
+
+def decode(header, arrays):
+    """Inverse of encode"""
+    if header["kind"] == "chains":
+        body = chains_from_arrays(arrays) if arrays else {}
+    else:
+        body = decode_rows(arrays) if arrays else []
+    return {**header["meta"], header["key"]: body}
@@ -0,0 +1,165 @@
+"""
+In-Process Pipeline Executor
+Imports each step's entry function once and runs them in one interpreter,
+handing results between steps through the artifact store. Steps declare
+the artifacts they read and write, and any step whose inputs are ready
+starts right away, so the news branch runs alongside the Tradier branch.
+With incremental=True, steps whose code, inputs and parameters are
+unchanged since their last successful run are skipped. Each run is then
+appended to the run history (pipeline/history.py).
+"""
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts, stamps, chain_store, history
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (step, script, entry function, description, inputs, outputs)
+STEPS = [
+    ("00a", "00a_get_sp500.py", "main", "Get S&P 500",
+     [], ["data/sp500.json"]),
+    ("00b", "00b_filter_price.py", "main", "Filter Price",
+     ["data/sp500.json"], ["data/filter1_passed.json", "data/filter1_failed.json"]),
+    ("00c", "00c_filter_options.py", "main", "Filter Options",
+     ["data/filter1_passed.json"], ["data/filter2_passed.json", "data/filter2_failed.json"]),
+    ("00d", "00d_filter_iv.py", "main", "Filter IV",
+     ["data/filter2_passed.json"], ["data/filter3_passed.json", "data/filter3_failed.json"]),
+    ("00e", "00e_select_22.py", "main", "Select 22",
+     ["data/filter3_passed.json"], ["data/filter4_passed.json", "data/stocks.py"]),
+    ("00f", "00f_get_news.py", "get_news_for_stocks", "Get News",
+     ["data/stocks.py"], ["data/finnhub_news.json"]),
+    ("00g", "00g_gpt_sentiment_filter.py", "analyze_news_sentiment", "GPT Sentiment",
+     ["data/finnhub_news.json", "data/stocks.py"], ["data/sentiment_filtered.json"]),
+    ("01", "01_get_prices.py", "main", "Get Prices",
+     ["data/stocks.py"], ["data/stock_prices.json"]),
+    ("02", "02_get_chains.py", "get_chains", "Get Chains",
+     ["data/stock_prices.json"], ["data/chains.npz", "data/chains.snap"]),
+    ("03", "03_check_liquidity.py", "main", "Check Liquidity",
+     ["data/chains.snap"], ["data/liquid_chains.npz"]),
+    ("04", "04_get_greeks.py", "get_connected_greeks", "Get Greeks",
+     ["data/chains.npz", "data/chains.snap", "data/stock_prices.json"],
+     ["data/chains_with_greeks.npz", "data/chains_with_greeks.snap"]),
+    ("05", "05_calculate_spreads.py", "calculate_spreads", "Calculate Spreads",
+     ["data/chains_with_greeks.snap", "data/stock_prices.json"], ["data/spreads.npz"]),
+    ("06", "06_rank_spreads.py", "rank_spreads", "Rank Spreads",
+     ["data/spreads.npz", "data/sentiment_filtered.json", "data/stocks.py"], ["data/ranked_spreads.json"]),
+    ("07", "07_build_report.py", "build_report_table", "Build Report",
+     ["data/ranked_spreads.json"], ["data/report_table.json"]),
+    ("08", "08_gpt_analysis.py", "main", "GPT Analysis",
+     ["data/report_table.json", "data/stock_prices.json", "data/finnhub_news.json"], ["data/top9_analysis.json"]),
+    ("09", "09_format_trades.py", "main", "Format Trades",
+     ["data/top9_analysis.json"], []),
+]
+
+_entries = {}
+
+def load_entry(step, script, entry):
+    """Import a step script once and return its entry function"""
+    if step not in _entries:
+        path = os.path.join(PIPELINE_DIR, script)
+        spec = importlib.util.spec_from_file_location(f"pipeline_step_{step}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _entries[step] = getattr(module, entry)
+    return _entries[step]
+
+def run_step(step, script, entry):
+    """Run one step in this process, returns (ok, elapsed)"""
+    start = time.time()
+    try:
+        load_entry(step, script, entry)()
+        ok = True
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+    except Exception as e:
+        print(f"❌ {step}: {type(e).__name__}: {e}")
+        ok = False
+    return ok, time.time() - start
+
+def dependencies(steps):
+    """Map each step to the steps that produce its inputs"""
+    producers = {}
+    for step, script, entry, desc, inputs, outputs in steps:
+        for path in outputs:
+            producers[path] = step
+    deps = {}
+    for step, script, entry, desc, inputs, outputs in steps:
+        deps[step] = {producers[p] for p in inputs if p in producers and producers[p] != step}
+    return deps
+
+def run_pipeline(steps=STEPS, write_artifacts=True, on_start=None, on_finish=None, parallel=True,
+                 incremental=False, force=(), params=None, on_skip=None, record_history=True):
+    """Run steps as soon as their inputs exist, returns the number completed
+
+    Inputs produced by a step outside `steps` are read from disk. After a
+    failure no new steps start; steps already running are allowed to finish.
+    Incremental runs need the artifacts on disk, so they require
+    write_artifacts; steps listed in `force` always run. With
+    record_history, the artifacts of the steps that ran are appended to
+    the history database (skipped steps only point at the run that made
+    theirs); a history error is reported but does not fail the run.
+    """
+    started_at = datetime.now()
+    artifacts.configure(in_memory=True, write=write_artifacts)
+    chain_store.begin_snapshot()
+    incremental = incremental and write_artifacts
+    deps = dependencies(steps)
+    keys = {}
+    pending = list(steps)
+    running = {}
+    done = set()
+    skipped = set()
+    failed = False
+
+    with ThreadPoolExecutor(max_workers=len(steps) if parallel else 1) as pool:
+        while pending or running:
+            ready = [s for s in pending if deps[s[0]] <= done]
+            while ready:
+                for s in ready:
+                    step, script, entry, desc, inputs, outputs = s
+                    pending.remove(s)
+                    if incremental:
+                        code = stamps.code_paths(os.path.join(PIPELINE_DIR, script))
+                        keys[step] = stamps.step_key(step, code, inputs, params)
+                        if step not in force and stamps.is_fresh(step, keys[step], outputs):
+                            if on_skip:
+                                on_skip(step, desc)
+                            done.add(step)
+                            skipped.add(step)
+                            continue
+                    if on_start:
+                        on_start(step, desc)
+                    running[pool.submit(run_step, step, script, entry)] = s
+                ready = [s for s in pending if deps[s[0]] <= done]
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step, script, entry, desc = running.pop(future)[:4]
+                ok, elapsed = future.result()
+                if on_finish:
+                    on_finish(step, desc, ok, elapsed)
+                if ok:
+                    done.add(step)
+                    if step in keys:
+                        stamps.record(step, keys[step])
+                else:
+                    failed = True
+            if failed:
+                pending.clear()
+
+    if record_history:
+        try:
+            run_id = history.record_run(started_at, steps, done - skipped, skipped, params)
+            print(f"🗄️  Run {run_id} recorded in {history.HISTORY_FILE}")
+        except Exception as e:
+            print(f"⚠️  Run history not recorded: {type(e).__name__}: {e}")
+
+    return len(done)
@@ -0,0 +1,280 @@
+"""
+Run History - every pipeline run appended to one SQLite database
+The step artifacts are overwritten by each run; this keeps them. When a run
+ends, the executor records the funnel (each ticker's pass/fail per filter
+stage, with the reason, plus its untruncated spread candidate count), the
+chain snapshot with greeks, the spreads step 05 kept (top_spreads: only
+the best RANK_PER_TICKER per ticker, not every candidate) and the ranked
+picks, all keyed by run_id. Only steps that actually ran are recorded: a
+step an incremental run skipped as fresh gets a run_steps row pointing at
+the run that produced its artifacts (source_run_id) instead of a second
+copy of them. Tables are indexed by ticker, run start time and strategy,
+and query() reads them back with those filters.
+
+HISTORY_FILE sets the database path (default data/history.sqlite).
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from pipeline import artifacts, snapshot
+
+HISTORY_FILE = os.environ.get("HISTORY_FILE", "data/history.sqlite")
+CHAIN_SNAPSHOT = "data/chains_with_greeks.snap"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    steps_total INTEGER NOT NULL,
+    steps_completed INTEGER NOT NULL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    step TEXT NOT NULL,
+    skipped INTEGER NOT NULL,
+    source_run_id INTEGER REFERENCES runs(run_id)
+);
+CREATE TABLE IF NOT EXISTS funnel (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    stage TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    reason TEXT,
+    candidates INTEGER
+);
+CREATE TABLE IF NOT EXISTS chains (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    ticker TEXT NOT NULL,
+    expiration TEXT NOT NULL,
+    dte INTEGER NOT NULL,
+    strike REAL NOT NULL,
+    side TEXT NOT NULL,
+    bid REAL, ask REAL,
+    iv REAL, delta REAL, gamma REAL, theta REAL, vega REAL,
+    open_interest INTEGER, volume INTEGER
+);
+CREATE TABLE IF NOT EXISTS top_spreads (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    ticker TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    expiration TEXT NOT NULL,
+    dte INTEGER NOT NULL,
+    stock_price REAL,
+    short_strike REAL, long_strike REAL, width REAL,
+    net_credit REAL, max_loss REAL, roi REAL, pop REAL,
+    short_iv REAL, short_delta REAL
+);
+CREATE TABLE IF NOT EXISTS picks (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    rank INTEGER NOT NULL,
+    decision TEXT NOT NULL,
+    score REAL,
+    ticker TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    expiration TEXT NOT NULL,
+    dte INTEGER NOT NULL,
+    stock_price REAL,
+    short_strike REAL, long_strike REAL, width REAL,
+    net_credit REAL, max_loss REAL, roi REAL, pop REAL,
+    short_iv REAL, short_delta REAL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS run_steps_step ON run_steps(step, run_id);
+CREATE INDEX IF NOT EXISTS funnel_ticker ON funnel(ticker, run_id);
+CREATE INDEX IF NOT EXISTS funnel_run ON funnel(run_id, stage);
+CREATE INDEX IF NOT EXISTS chains_ticker ON chains(ticker, run_id, expiration);
+CREATE INDEX IF NOT EXISTS chains_run ON chains(run_id);
+CREATE INDEX IF NOT EXISTS top_spreads_ticker ON top_spreads(ticker, run_id);
+CREATE INDEX IF NOT EXISTS top_spreads_strategy ON top_spreads(strategy, run_id);
+CREATE INDEX IF NOT EXISTS top_spreads_run ON top_spreads(run_id);
+CREATE INDEX IF NOT EXISTS picks_ticker ON picks(ticker, run_id);
+CREATE INDEX IF NOT EXISTS picks_strategy ON picks(strategy, run_id);
+CREATE INDEX IF NOT EXISTS picks_run ON picks(run_id);
+"""
+
+# (step, stage, passed artifact, failed artifact); the failed artifact
+# lists {ticker, reason}
+FILTER_STAGES = (
+    ("00b", "price", "data/filter1_passed.json", "data/filter1_failed.json"),
+    ("00c", "options", "data/filter2_passed.json", "data/filter2_failed.json"),
+    ("00d", "iv", "data/filter3_passed.json", "data/filter3_failed.json"),
+)
+SPREAD_FIELDS = ("stock_price", "short_strike", "long_strike", "width", "net_credit",
+                 "max_loss", "roi", "pop", "short_iv", "short_delta")
+CHAIN_FIELDS = ("bid", "ask", "iv", "delta", "gamma", "theta", "vega", "open_interest", "volume")
+TICKER_TABLES = ("funnel", "chains", "top_spreads", "picks")
+# Step whose artifact fills each table, for following skipped steps to their source run
+TABLE_STEPS = {"chains": "04", "top_spreads": "05", "picks": "06"}
+STRATEGY_TABLES = ("top_spreads", "picks")
+
+def connect(path=HISTORY_FILE):
+    """Open the history database, creating its tables on first use"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def _load(path):
+    """An artifact of this run, None when it was never written"""
+    try:
+        return artifacts.load(path)
+    except FileNotFoundError:
+        return None
+
+def funnel_rows(ran):
+    """(stage, ticker, passed, reason, candidates) for each filter stage that ran
+
+    candidates is only set on the "spreads" stage: every spread step 05
+    found for the ticker, before the per-ticker ranker cut it down.
+    """
+    rows = []
+    for step, stage, passed_path, failed_path in FILTER_STAGES:
+        if step not in ran:
+            continue
+        rows += [(stage, s["ticker"], 1, None, None) for s in _load(passed_path) or []]
+        rows += [(stage, s["ticker"], 0, s.get("reason"), None) for s in _load(failed_path) or []]
+    if "00e" in ran:
+        selected = {s["ticker"] for s in _load("data/filter4_passed.json") or []}
+        rows += [("select", t, 1, None, None) for t in selected]
+        rows += [("select", s["ticker"], 0, "not in top 22", None)
+                 for s in _load("data/filter3_passed.json") or [] if s["ticker"] not in selected]
+    if "00g" in ran:
+        sentiment = _load("data/sentiment_filtered.json") or {}
+        rows += [("sentiment", t, 1, None, None) for t in sentiment.get("keep", [])]
+        rows += [("sentiment", t, 0, reason, None) for t, reason in sentiment.get("remove", {}).items()]
+    if "05" in ran:
+        candidates = (_load("data/spreads.npz") or {}).get("candidates_by_ticker", {})
+        rows += [("spreads", t, int(n > 0), None if n else "no qualifying spreads", n)
+                 for t, n in candidates.items()]
+    return rows
+
+def chain_rows(path=CHAIN_SNAPSHOT):
+    """(ticker, expiration, dte, strike, side, CHAIN_FIELDS...) per listed contract in a snapshot"""
+    snap = snapshot.load(path)
+    records = snap.records
+    if not len(records):
+        return []
+    tickers, expirations, dtes = snap.row_keys()
+    rows = []
+    for side in snapshot.SIDES:
+        listed = records[f"{side}_listed"]
+        columns = [tickers[listed].tolist(), expirations[listed].tolist(), dtes[listed].tolist(),
+                   records["strike"][listed].tolist(), [side] * int(listed.sum())]
+        for field in CHAIN_FIELDS:
+            values = records[f"{side}_{field}"][listed]
+            # NaN (no greeks) is stored as NULL
+            columns.append([None if v != v else v for v in values.tolist()]
+                           if values.dtype.kind == "f" else values.tolist())
+        rows += zip(*columns)
+    return rows
+
+def _spread_values(spread):
+    expiration = spread["expiration"]
+    return ((spread["ticker"], spread["type"], expiration["date"], expiration["dte"])
+            + tuple(spread.get(field) for field in SPREAD_FIELDS))
+
+def _source_run(conn, step):
+    """The run whose artifacts a step last produced, None if it never ran on record"""
+    row = conn.execute("SELECT source_run_id FROM run_steps WHERE step = ? ORDER BY run_id DESC LIMIT 1",
+                       (step,)).fetchone()
+    return row[0] if row else None
+
+def record_run(started_at, steps, ran, skipped=(), params=None, path=HISTORY_FILE):
+    """Append one run's funnel, chains, top spreads and picks; returns its run_id
+
+    started_at is a datetime; ran holds the steps that completed in this
+    run and skipped the ones found fresh. Only the artifacts of ran steps
+    are recorded; skipped steps point at their source run.
+    """
+    conn = connect(path)
+    try:
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (started_at, finished_at, steps_total, steps_completed, params)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (started_at.isoformat(), datetime.now().isoformat(), len(steps), len(ran) + len(skipped),
+                 json.dumps(params or {}, sort_keys=True))).lastrowid
+            conn.executemany("INSERT INTO run_steps VALUES (?, ?, ?, ?)",
+                             [(run_id, step, 1, _source_run(conn, step)) for step in sorted(skipped)]
+                             + [(run_id, step, 0, run_id) for step in sorted(ran)])
+
+            conn.executemany("INSERT INTO funnel VALUES (?, ?, ?, ?, ?, ?)",
+                             ((run_id, *row) for row in funnel_rows(ran)))
+            if "04" in ran and os.path.exists(CHAIN_SNAPSHOT):
+                conn.executemany(f"INSERT INTO chains VALUES ({', '.join('?' * 15)})",
+                                 ((run_id, *row) for row in chain_rows()))
+            if "05" in ran:
+                spreads = (_load("data/spreads.npz") or {}).get("spreads", [])
+                conn.executemany(f"INSERT INTO top_spreads VALUES ({', '.join('?' * 15)})",
+                                 ((run_id, *_spread_values(s)) for s in spreads))
+            if "06" in ran:
+                ranked = (_load("data/ranked_spreads.json") or {}).get("ranked_spreads", [])
+                conn.executemany(f"INSERT INTO picks VALUES ({', '.join('?' * 18)})",
+                                 ((run_id, s["rank"], s["decision"], s.get("score"), *_spread_values(s))
+                                  for s in ranked))
+        return run_id
+    finally:
+        conn.close()
+
+def query(table, ticker=None, strategy=None, since=None, until=None, run_id=None, path=HISTORY_FILE):
+    """Rows of a history table as dicts, each with its run's started_at
+
+    since/until are ISO dates or datetimes (since inclusive, until
+    exclusive) matched against the run's start; strategy is the spread
+    type ("Bull Put", "Bear Call") and applies to top_spreads and picks.
+    For chains, top_spreads and picks a run_id whose step was skipped is
+    followed to the run that produced the artifact.
+    """
+    if table not in TICKER_TABLES:
+        raise ValueError(f"unknown history table: {table}")
+    if strategy is not None and table not in STRATEGY_TABLES:
+        raise ValueError(f"{table} has no strategy column")
+    conn = connect(path)
+    try:
+        if run_id is not None and table in TABLE_STEPS:
+            row = conn.execute("SELECT source_run_id FROM run_steps WHERE run_id = ? AND step = ?",
+                               (run_id, TABLE_STEPS[table])).fetchone()
+            if row and row[0] is not None:
+                run_id = row[0]
+        return [dict(row) for row in conn.execute(*_select(table, ticker, strategy, since, until, run_id))]
+    finally:
+        conn.close()
+
+def _select(table, ticker, strategy, since, until, run_id):
+    """(sql, args) for query()"""
+    where, args = [], []
+    for column, value in (("t.ticker", ticker), ("t.strategy", strategy), ("t.run_id", run_id)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            args.append(value)
+    if since is not None:
+        where.append("r.started_at >= ?")
+        args.append(str(since))
+    if until is not None:
+        where.append("r.started_at < ?")
+        args.append(str(until))
+    sql = f"SELECT r.started_at, t.* FROM {table} t JOIN runs r ON r.run_id = t.run_id"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t.run_id, t.rowid"
+    return sql, args
+
+def runs(since=None, until=None, path=HISTORY_FILE):
+    """Recorded runs, oldest first"""
+    where, args = [], []
+    if since is not None:
+        where.append("started_at >= ?")
+        args.append(str(since))
+    if until is not None:
+        where.append("started_at < ?")
+        args.append(str(until))
+    sql = "SELECT * FROM runs" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY run_id"
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, args)]
+    finally:
+        conn.close()
@@ -0,0 +1,80 @@
+"""
+IV Solver - implied volatility and Greeks from option mids, computed locally
+All contracts are solved as one array: vectorized Newton steps from a
+Brenner-Subrahmanyam guess, safeguarded by bisection, then Brent's method
+for the few stragglers Newton could not pin down. Mids outside the
+no-arbitrage bounds have no IV and come back as NaN.
+"""
+import os
+import sys
+
+import numpy as np
+from scipy.optimize import brentq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import bs
+
+MIN_VOL, MAX_VOL = 1e-4, 5.0
+NEWTON_STEPS = 40
+TOLERANCE = 1e-6        # Price error, dollars
+
+def implied_vol(price, S, K, T, r, is_call):
+    """IV per contract (decimal), NaN where the price admits none"""
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    discount = np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(S - K * discount, 0), np.maximum(K * discount - S, 0))
+    upper = np.where(is_call, S, K * discount)
+    valid = (T > 0) & (price > lower) & (price < upper)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.clip(np.sqrt(2 * np.pi / T) * price / S, 0.05, 3.0)
+    sigma = np.where(valid, sigma, np.nan)
+    lo = np.full(price.shape, MIN_VOL)
+    hi = np.full(price.shape, MAX_VOL)
+
+    # Newton, kept inside a shrinking [lo, hi] bracket; a step that leaves
+    # the bracket (or has no vega) bisects instead
+    active = np.flatnonzero(valid)
+    for _ in range(NEWTON_STEPS):
+        if not active.size:
+            break
+        a = (S[active], K[active], T[active], sigma[active], r[active], is_call[active])
+        diff = bs.price(*a) - price[active]
+        done = np.abs(diff) < TOLERANCE
+        hi[active] = np.where(diff > 0, a[3], hi[active])
+        lo[active] = np.where(diff < 0, a[3], lo[active])
+        vega = bs.greeks(*a)["vega"] * 100
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = a[3] - diff / vega
+        inside = (vega > 1e-8) & (step > lo[active]) & (step < hi[active])
+        sigma[active] = np.where(done, a[3], np.where(inside, step, (lo[active] + hi[active]) / 2))
+        active = active[~done]
+
+    for k in active:
+        f = lambda v: float(bs.price(S[k], K[k], T[k], v, r[k], is_call[k])) - price[k]
+        try:
+            sigma[k] = brentq(f, MIN_VOL, MAX_VOL, xtol=1e-8)
+        except ValueError:
+            sigma[k] = np.nan
+    return np.where(valid, sigma, np.nan)
+
+def greeks_records(price, S, K, T, r, is_call):
+    """greeks_record-style dicts (None where no IV) for arrays of contracts"""
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r)))
+    iv = implied_vol(price, S, K, T, r, is_call)
+    g = bs.greeks(S, K, T, np.where(np.isnan(iv), 1.0, iv), r, is_call)
+    columns = [iv.tolist()] + [g[name].tolist() for name in ("delta", "theta", "gamma", "vega")]
+    records = []
+    for v, delta, theta, gamma, vega in zip(*columns):
+        if np.isnan(v) or v <= 0:
+            records.append(None)
+            continue
+        records.append({
+            "iv": round(v, 4),
+            "delta": round(delta, 4),
+            "theta": round(theta, 4),
+            "gamma": round(gamma, 6),
+            "vega": round(vega, 4)
+        })
+    return records
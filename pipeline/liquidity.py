@@ -0,0 +1,58 @@
+"""
+Liquidity Rules - which option contracts are worth quoting
+Contracts are judged as columns: bid, ask, open interest, volume and the
+bid/ask sizes, one row per contract, across as many tickers and
+expirations as the caller packs together. Every rule in RULES is a mask
+over those columns and a contract is liquid when it passes them all.
+Step 02 applies the rules as it builds chains, so greeks (04) and spread
+pairing (05) only ever see contracts that pass; step 03 reports on them.
+"""
+import numpy as np
+
+MIN_MID = 0.30
+MAX_SPREAD_PCT = 10
+MIN_OPEN_INTEREST = 0     # 0 disables the rule
+MIN_VOLUME = 0            # 0 disables the rule
+MIN_QUOTE_SIZE = 0        # Contracts on the thinner side of the quote; 0 disables the rule
+
+FIELDS = ("bid", "ask", "open_interest", "volume", "bidsize", "asksize")
+
+def mid_and_spread_pct(bid, ask):
+    """Mid and spread as % of mid, with the spread infinite for a locked or crossed quote"""
+    bid, ask = np.asarray(bid, dtype=float), np.asarray(ask, dtype=float)
+    mid = np.where(ask > 0, (bid + ask) / 2, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread_pct = np.where((ask > bid) & (mid > 0), (ask - bid) / mid * 100, np.inf)
+    return mid, spread_pct
+
+def _mid(c):
+    return mid_and_spread_pct(c["bid"], c["ask"])[0] >= MIN_MID
+
+def _spread(c):
+    return mid_and_spread_pct(c["bid"], c["ask"])[1] < MAX_SPREAD_PCT
+
+RULES = (
+    ("mid", _mid),
+    ("spread", _spread),
+    ("open_interest", lambda c: c["open_interest"] >= MIN_OPEN_INTEREST),
+    ("volume", lambda c: c["volume"] >= MIN_VOLUME),
+    ("quote_size", lambda c: np.minimum(c["bidsize"], c["asksize"]) >= MIN_QUOTE_SIZE),
+)
+
+def columns(options):
+    """FIELDS columns from payloads.Option records"""
+    options = list(options)
+    return {field: np.array([getattr(opt, field) for opt in options], dtype=float) for field in FIELDS}
+
+def evaluate(cols):
+    """(liquid mask, {rule: contracts it rejected}) for packed columns
+
+    A contract failing several rules is counted under each of them.
+    """
+    liquid = np.ones(len(cols["bid"]), dtype=bool)
+    rejected = {}
+    for name, rule in RULES:
+        passed = rule(cols)
+        rejected[name] = int((~passed).sum())
+        liquid &= passed
+    return liquid, rejected
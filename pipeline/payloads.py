@@ -0,0 +1,81 @@
+"""
+Tradier Payloads - compact, type-checked records for options and quotes
+A chain option carries ~34 fields; the pipeline reads about ten. Payloads
+are decoded once, right after the response, into __slots__ records that
+keep only those fields as floats/ints/strings. Wrong types fail here, at
+decode time, instead of deep inside a step. A missing or null number
+decodes as 0, which is how every step already treated it.
+"""
+
+class PayloadError(ValueError):
+    """A payload field has the wrong type"""
+
+def _number(item, field, cast):
+    value = item.get(field)
+    if value is None or value == "":
+        return cast(0)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise PayloadError(f"{item.get('symbol', '?')}: {field} is {type(value).__name__}, expected a number")
+    return cast(value)
+
+def _text(item, field):
+    value = item.get(field)
+    if not isinstance(value, str) or not value:
+        raise PayloadError(f"{item.get('symbol', '?')}: {field} is {value!r}, expected a string")
+    return value
+
+class Greeks:
+    __slots__ = ("mid_iv", "delta", "theta", "gamma", "vega")
+
+    def __init__(self, mid_iv, delta, theta, gamma, vega):
+        self.mid_iv, self.delta, self.theta, self.gamma, self.vega = mid_iv, delta, theta, gamma, vega
+
+    @classmethod
+    def decode(cls, item):
+        """Greeks from a payload's 'greeks' object, None when it is absent"""
+        if not item:
+            return None
+        if not isinstance(item, dict):
+            raise PayloadError(f"greeks is {type(item).__name__}, expected an object")
+        return cls(*(_number(item, field, float) for field in cls.__slots__))
+
+class Option:
+    __slots__ = ("symbol", "option_type", "strike", "bid", "ask",
+                 "open_interest", "volume", "bidsize", "asksize", "greeks")
+
+    def __init__(self, symbol, option_type, strike, bid, ask,
+                 open_interest=0, volume=0, bidsize=0, asksize=0, greeks=None):
+        self.symbol, self.option_type, self.strike = symbol, option_type, strike
+        self.bid, self.ask = bid, ask
+        self.open_interest, self.volume, self.bidsize, self.asksize = open_interest, volume, bidsize, asksize
+        self.greeks = greeks
+
+    @classmethod
+    def decode(cls, item):
+        option_type = _text(item, "option_type")
+        if option_type not in ("call", "put"):
+            raise PayloadError(f"{item.get('symbol', '?')}: option_type is {option_type!r}")
+        if item.get("strike") is None:
+            raise PayloadError(f"{item.get('symbol', '?')}: no strike")
+        return cls(_text(item, "symbol"), option_type, _number(item, "strike", float),
+                   _number(item, "bid", float), _number(item, "ask", float),
+                   _number(item, "open_interest", int), _number(item, "volume", int),
+                   _number(item, "bidsize", int), _number(item, "asksize", int),
+                   Greeks.decode(item.get("greeks")))
+
+class Quote:
+    __slots__ = ("symbol", "bid", "ask", "greeks")
+
+    def __init__(self, symbol, bid, ask, greeks=None):
+        self.symbol, self.bid, self.ask, self.greeks = symbol, bid, ask, greeks
+
+    @classmethod
+    def decode(cls, item):
+        return cls(_text(item, "symbol"), _number(item, "bid", float), _number(item, "ask", float),
+                   Greeks.decode(item.get("greeks")))
+
+def options(items):
+    return [Option.decode(item) for item in items]
+
+def quotes(items):
+    return [Quote.decode(item) for item in items]
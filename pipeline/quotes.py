@@ -0,0 +1,62 @@
+"""
+Bulk Quotes - price a whole symbol list in as few requests as possible
+Symbols are packed QUOTE_BATCH_SIZE to a POST body, batches run
+concurrently on the shared Tradier client, and the responses are merged
+into one symbol-keyed snapshot.
+"""
+import os
+import sys
+import time
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import tradier
+
+QUOTE_BATCH_SIZE = 1000      # Symbols per POST body
+
+def _fetch_batch(batch, greeks):
+    start = time.time()
+    try:
+        data = tradier.fetch_quotes(batch, greeks=greeks)
+        error = None
+    except tradier.TradierError as e:
+        data = None
+        error = str(e)
+    return batch, data, error, time.time() - start
+
+def fetch_snapshot(symbols, greeks=False, batch_size=QUOTE_BATCH_SIZE):
+    """Quote every symbol, returns (snapshot, failed, batches)
+
+    snapshot maps symbol -> payloads.Quote, failed lists the symbols whose batch
+    errored, and batches holds one {"size", "seconds", "error"} per request.
+    Symbols are batched in sorted order, so the same set always makes the
+    same requests (and record/replay cassettes match) whatever order the
+    caller collected them in.
+    """
+    symbols = sorted(set(symbols))
+    chunks = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    snapshot = {}
+    failed = []
+    batches = []
+    with ThreadPoolExecutor(max_workers=tradier.MAX_WORKERS) as executor:
+        futures = [executor.submit(_fetch_batch, chunk, greeks) for chunk in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            batch, data, error, seconds = future.result()
+            batches.append({"size": len(batch), "seconds": round(seconds, 3), "error": error})
+            if data is None:
+                failed.extend(batch)
+                continue
+            for q in data:
+                snapshot[q.symbol] = q
+    return snapshot, failed, batches
+
+def report(batches):
+    """One-line latency summary for fetch_snapshot's batches"""
+    if not batches:
+        return "Quotes: 0 requests"
+    times = [b["seconds"] for b in batches]
+    errors = len([b for b in batches if b["error"]])
+    return (f"Quotes: {len(batches)} requests, {sum(b['size'] for b in batches)} symbols, "
+            f"batch latency avg {sum(times) / len(times):.2f}s / max {max(times):.2f}s, {errors} failed")
@@ -0,0 +1,47 @@
+"""
+Ranker - streaming best-per-ticker selection for spreads
+Spreads are pushed as they are generated; each ticker keeps a bounded
+min-heap of its best, so memory scales with tickers x per_ticker instead
+of with the candidate count. Ties go to the spread generated first,
+which reproduces step 06's stable sort over the full list.
+"""
+import heapq
+
+RANK_PER_TICKER = 10    # Spreads kept per ticker in spreads.npz
+
+def score(spread):
+    """(ROI x PoP) / 100"""
+    return round((spread["roi"] * spread["pop"]) / 100, 1)
+
+def decision(spread):
+    if spread["pop"] >= 70 and spread["roi"] >= 20:
+        return "ENTER"
+    if spread["pop"] >= 60 and spread["roi"] >= 30:
+        return "WATCH"
+    return "SKIP"
+
+class Ranker:
+    def __init__(self, per_ticker=RANK_PER_TICKER):
+        self.per_ticker = per_ticker
+        self.heaps = {}
+        self.seen = 0
+
+    def push(self, spread):
+        # Higher score wins, then the earlier spread; seq makes keys unique
+        key = (score(spread), -self.seen)
+        self.seen += 1
+        heap = self.heaps.setdefault(spread["ticker"], [])
+        if len(heap) < self.per_ticker:
+            heapq.heappush(heap, (key, spread))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, spread))
+
+    def kept(self):
+        """Every retained spread, in generation order"""
+        items = [item for heap in self.heaps.values() for item in heap]
+        return [spread for _, spread in sorted(items, key=lambda item: -item[0][1])]
+
+    def ranked(self, top_k=None):
+        """Best spread per ticker, best score first (the first top_k if given)"""
+        best = sorted((max(heap) for heap in self.heaps.values() if heap), key=lambda item: item[0], reverse=True)
+        return [spread for _, spread in best[:top_k]]
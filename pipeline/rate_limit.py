@@ -0,0 +1,89 @@
+"""
+Rate Limiter - one token bucket for every thread that calls Tradier
+Tokens come from Tradier's X-Ratelimit-* headers when they are present and
+refill at the configured rate otherwise. Concurrency adapts AIMD-style:
+halved on a 429, raised by one after a window's worth of clean responses.
+"""
+import threading
+import time
+
+class RateLimiter:
+    def __init__(self, rate=120, per=60.0, max_concurrency=10, min_concurrency=1):
+        self.capacity = rate
+        self.refill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.reset_at = None            # Wall-clock time the server window resets
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max_concurrency
+        self.in_flight = 0
+        self.clean = 0
+        self.backoff = 1.0
+        self.counts = {"requests": 0, "throttled": 0, "waited": 0.0}
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.reset_at is not None:
+            if time.time() >= self.reset_at:
+                self.tokens = float(self.capacity)
+                self.reset_at = None
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token and a concurrency slot are free"""
+        start = time.monotonic()
+        with self.cond:
+            while True:
+                self._refill()
+                if self.tokens >= 1 and self.in_flight < self.concurrency:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.counts["requests"] += 1
+                    self.counts["waited"] += time.monotonic() - start
+                    return
+                if self.reset_at is not None:
+                    wait = self.reset_at - time.time()
+                else:
+                    wait = (1 - self.tokens) / self.refill_rate
+                self.cond.wait(min(max(wait, 0.01), 1.0))
+
+    def release(self, resp=None):
+        """Return the slot and learn from the response headers"""
+        with self.cond:
+            self.in_flight -= 1
+            if resp is not None:
+                self._update(resp.status_code, resp.headers)
+            self.cond.notify_all()
+
+    def _update(self, status, headers):
+        allowed = headers.get('X-Ratelimit-Allowed')
+        available = headers.get('X-Ratelimit-Available')
+        expiry = headers.get('X-Ratelimit-Expiry')
+        if allowed:
+            self.capacity = int(allowed)
+        if available is not None and expiry:
+            self.tokens = float(max(0, int(available) - self.in_flight))
+            self.reset_at = int(expiry) / 1000.0
+
+        if status == 429:
+            self.counts["throttled"] += 1
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self.clean = 0
+            self.tokens = 0.0
+            if self.reset_at is None or self.reset_at <= time.time():
+                self.reset_at = time.time() + self.backoff
+            self.backoff = min(self.backoff * 2, 60.0)
+        else:
+            self.backoff = 1.0
+            self.clean += 1
+            if self.clean >= self.concurrency and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self.clean = 0
+
+    def stats(self):
+        with self.cond:
+            return {**self.counts, "concurrency": self.concurrency}
@@ -0,0 +1,95 @@
+"""
+Risk-Free Rates - Treasury curve from FRED, resolved once per run
+The 1M/3M/6M/1Y constant-maturity yields come down in one FRED request a
+day and are cached in data/rate.json. After the first lookup the curve is
+held in memory, and rate(dte) interpolates it linearly in days, held flat
+beyond the 1M and 1Y points. Like the response cache, rate.json is only
+read in live mode and never written on replay, so replays take the
+recorded curve.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import cassette
+
+CACHE_FILE = "data/rate.json"
+FALLBACK_RATE = 0.042
+# FRED series -> tenor in days
+SERIES = {"DGS1MO": 30, "DGS3MO": 91, "DGS6MO": 182, "DGS1": 365}
+URL = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={','.join(SERIES)}"
+
+_curve = None
+_lock = threading.Lock()
+
+def _parse(text):
+    """{days: rate} from the latest non-missing value of each series"""
+    lines = [line.split(',') for line in text.splitlines() if line.strip()]
+    header, rows = lines[0], lines[1:]
+    points = {}
+    for col, name in enumerate(header):
+        if name not in SERIES:
+            continue
+        for row in reversed(rows):
+            if col < len(row) and row[col] not in ('.', ''):
+                points[SERIES[name]] = float(row[col]) / 100
+                break
+    return points
+
+def _fetch():
+    for attempt in range(3):  # Retry logic
+        try:
+            status, text = cassette.get_text('fred', URL, timeout=5)
+            if status == 200:
+                points = _parse(text)
+                if points:
+                    return points
+            print(f"⚠️ Rate fetch attempt {attempt+1} failed: {status}")
+        except Exception as e:
+            print(f"⚠️ Rate fetch error: {e}, attempt {attempt+1}")
+        time.sleep(2 ** attempt)
+    return None
+
+def _load():
+    today = cassette.now().date().isoformat()
+    if cassette.mode() == "live":
+        try:
+            with open(CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+            if cache.get('date') == today and cache.get('curve'):
+                return {int(days): rate for days, rate in cache['curve'].items()}
+        except (OSError, ValueError):
+            pass
+
+    points = _fetch()
+    if points:
+        print("📈 Fetched Treasury curve: " + ", ".join(f"{d}d {r*100:.2f}%" for d, r in sorted(points.items())))
+    else:
+        print(f"❌ Rate fetch failed, using fallback {FALLBACK_RATE}")
+        points = {SERIES["DGS3MO"]: FALLBACK_RATE}
+    if cassette.mode() == "replay":
+        return points
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, 'w') as f:
+        json.dump({'date': today, 'rate': points.get(SERIES["DGS3MO"], FALLBACK_RATE),
+                   'curve': {str(d): r for d, r in sorted(points.items())}}, f)
+    return points
+
+def curve():
+    """{tenor days: rate}, loaded once per process per day"""
+    global _curve
+    today = cassette.now().date()
+    with _lock:
+        if _curve is None or _curve[0] != today:
+            _curve = (today, _load())
+        return _curve[1]
+
+def rate(dte):
+    """Risk-free rate for a DTE, interpolated along the curve"""
+    points = sorted(curve().items())
+    return float(np.interp(dte, [d for d, _ in points], [r for _, r in points]))
@@ -0,0 +1,104 @@
+"""
+Response Cache - disk cache in front of Tradier's chain and expiration endpoints
+Fetched payloads live in data/.cache/live as the raw JSON:
+    expirations__<TICKER>__exp.json      valid for the trading day
+    chain__<TICKER>__<YYYY-MM-DD>.json   valid for CHAIN_TTL seconds while the
+                                         market is open; a chain fetched after
+                                         the close stays valid until the next open
+Each stored payload carries a "_fetched_at" timestamp. The seed payloads
+checked into data/.cache itself are never written or served as fresh; they
+are only the replay fallback and the mock server's cache source.
+In record mode the cache is written but never read, so the cassette sees
+every request; in replay it is bypassed and only serves as the seed.
+"""
+import json
+import os
+import sys
+import threading
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import cassette
+
+SEED_DIR = "data/.cache"
+CACHE_DIR = os.path.join(SEED_DIR, "live")
+CHAIN_TTL = int(os.environ.get("CHAIN_CACHE_TTL", "300"))
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+_counts = {"hit": 0, "miss": 0}
+_lock = threading.Lock()
+
+def market_open(now):
+    """True during regular hours (holidays are not modelled)"""
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def last_close(now):
+    """Most recent regular-session close at or before now"""
+    day = now.date()
+    while True:
+        close = datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TZ)
+        if day.weekday() < 5 and close <= now:
+            return close
+        day -= timedelta(days=1)
+
+def is_fresh(kind, fetched_at, now=None):
+    """Is a payload fetched at fetched_at (aware datetime) still usable"""
+    now = now or datetime.now(MARKET_TZ)
+    fetched_at = fetched_at.astimezone(MARKET_TZ)
+    if kind == "expirations":
+        return fetched_at.date() == now.date()
+    if market_open(now):
+        return (now - fetched_at).total_seconds() < CHAIN_TTL
+    return fetched_at >= last_close(now)
+
+def cache_path(kind, ticker, key):
+    return os.path.join(CACHE_DIR, f"{kind}__{ticker}__{key}.json")
+
+def seed_path(kind, ticker, key):
+    """The checked-in seed payload for a request"""
+    return os.path.join(SEED_DIR, f"{kind}__{ticker}__{key}.json")
+
+def cached(kind, ticker, key, fetch):
+    """Return the cached payload if fresh, otherwise fetch() and store it"""
+    if cassette.mode() == "replay":
+        return fetch()
+
+    path = cache_path(kind, ticker, key)
+    if cassette.mode() == "live":
+        try:
+            with open(path, "r") as f:
+                payload = json.load(f)
+            fetched_at = datetime.fromisoformat(payload["_fetched_at"])
+            if is_fresh(kind, fetched_at):
+                _count("hit")
+                return payload
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    _count("miss")
+    payload = fetch()
+    payload["_fetched_at"] = datetime.now(MARKET_TZ).isoformat()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+    return payload
+
+def _count(name):
+    with _lock:
+        _counts[name] += 1
+
+def stats():
+    with _lock:
+        return dict(_counts)
+
+def report(since):
+    """One-line hit/miss summary for the calls made after `since` = stats()"""
+    now = stats()
+    hits = now["hit"] - since["hit"]
+    misses = now["miss"] - since["miss"]
+    return f"Cache: {hits} hits, {misses} misses"
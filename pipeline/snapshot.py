@@ -0,0 +1,86 @@
+"""
+Chain Snapshot - every strike of a chain set in one memory-mapped file
+A snapshot file is a small JSON index header followed by one fixed-dtype
+record per strike (DTYPE), grouped by (ticker, expiration) in chain order.
+open() maps the records read-only, so steps and worker processes share the
+page cache's copy instead of each parsing and allocating their own.
+Sides a strike does not list have bid/ask 0 and {side}_listed False, and
+IV/greeks are NaN where a contract has none.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"CHNSNAP2"
+ALIGN = 64
+SIDES = ("call", "put")
+PRICE_FIELDS = ("bid", "ask")
+GREEK_FIELDS = ("iv", "delta", "gamma", "theta", "vega")
+SIZE_FIELDS = ("open_interest", "volume", "bidsize", "asksize")
+DTYPE = np.dtype([("strike", "f8")]
+                 + [(f"{side}_{f}", "f8") for side in SIDES for f in PRICE_FIELDS + GREEK_FIELDS]
+                 + [(f"{side}_{f}", "i8") for side in SIDES for f in SIZE_FIELDS]
+                 + [(f"{side}_listed", "?") for side in SIDES])
+
+class Snapshot:
+    """A mapped snapshot: index entries plus the strike records they slice"""
+
+    def __init__(self, meta, index, records):
+        self.meta = meta
+        self.index = index          # [(ticker, expiration_date, dte, start, stop)]
+        self.records = records
+
+    def row_keys(self):
+        """Per-record ticker, expiration_date and dte arrays, expanded from the index"""
+        counts = [stop - start for _, _, _, start, stop in self.index]
+        return tuple(np.repeat(np.array([entry[k] for entry in self.index]), counts) for k in range(3))
+
+def pack(chains):
+    """DTYPE records and index for {ticker: [expiration]} chain dicts"""
+    index, rows = [], []
+    for ticker, expirations in chains.items():
+        for exp_data in expirations:
+            start = len(rows)
+            for s in exp_data["strikes"]:
+                row = [s["strike"]]
+                for side in SIDES:
+                    greeks = s.get(f"{side}_greeks") or {}
+                    row += [s.get(f"{side}_{f}", 0) for f in PRICE_FIELDS]
+                    row += [greeks.get(f, np.nan) for f in GREEK_FIELDS]
+                for side in SIDES:
+                    row += [s.get(f"{side}_{f}", 0) for f in SIZE_FIELDS]
+                row += [f"{side}_symbol" in s or f"{side}_bid" in s for side in SIDES]
+                rows.append(tuple(row))
+            index.append((ticker, exp_data["expiration_date"], exp_data["dte"], start, len(rows)))
+    return np.array(rows, dtype=DTYPE), index
+
+def write(path, chains, **meta):
+    """Write chains as a snapshot; replaced atomically so open maps stay valid"""
+    write_records(path, *pack(chains), **meta)
+
+def write_records(path, records, index, **meta):
+    """write() for DTYPE records and index that are already packed"""
+    header = json.dumps({"meta": meta, "index": index, "rows": len(records)}).encode()
+    offset = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        f.write(b"\0" * (offset - f.tell()))
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+
+def load(path):
+    """Map a snapshot read-only"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a chain snapshot")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    offset = -(-(len(MAGIC) + 8 + length) // ALIGN) * ALIGN
+    if header["rows"]:
+        records = np.memmap(path, dtype=DTYPE, mode="r", offset=offset, shape=(header["rows"],))
+    else:
+        records = np.zeros(0, dtype=DTYPE)
+    return Snapshot(header["meta"], [tuple(entry) for entry in header["index"]], records)
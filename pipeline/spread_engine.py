@@ -0,0 +1,155 @@
+"""
+Spread Engine - columnar Bull Put / Bear Call enumeration for step 05
+Each expiration's snapshot rows are packed once into NumPy columns. Short legs
+are indexed up front by delta band and PoP, and each short is paired only
+with the long legs in its width window, found by bisecting the sorted
+strikes. All candidate pairs are then scored in one pass with the
+thresholds applied as masks. Rows come out in the same order as the old
+nested loops, so the spreads output is unchanged.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import bs
+
+# Spread filters. Step 05 imports this module, so its stamp key hashes
+# these values and editing one reruns 05 and everything downstream.
+MIN_DTE, MAX_DTE = 7, 45
+MIN_SHORT_DELTA, MAX_SHORT_DELTA = 0.15, 0.35
+MIN_CREDIT = 0.10
+MIN_ROI, MAX_ROI = 5, 50
+MIN_POP = 60
+MAX_SPREAD_WIDTH = None     # Widest spread in dollars, None for no cap
+MAX_SPREAD_STRIKES = None   # Long leg at most this many strikes from the short, None for no cap
+
+SIDES = (("put", "Bull Put", False), ("call", "Bear Call", True))
+FIELDS = ("bid", "ask", "iv", "delta", "greeks")
+COLUMNS = ["strike"] + [f"{side}_{field}" for side, _, _ in SIDES for field in FIELDS]
+
+def pack(rows):
+    """A slice of snapshot records as a float64 (strikes x COLUMNS) block; iv/delta are 0 without greeks"""
+    block = np.zeros((len(rows), len(COLUMNS)))
+    block[:, 0] = rows["strike"]
+    for side, _, _ in SIDES:
+        base = COLUMNS.index(f"{side}_bid")
+        iv = rows[f"{side}_iv"]
+        has_greeks = ~np.isnan(iv)
+        block[:, base] = rows[f"{side}_bid"]
+        block[:, base + 1] = rows[f"{side}_ask"]
+        block[:, base + 2] = np.where(has_greeks, iv, 0)
+        block[:, base + 3] = np.where(has_greeks, np.abs(rows[f"{side}_delta"]), 0)
+        block[:, base + 4] = has_greeks
+    return block
+
+def side_columns(block, side):
+    """strike, bid, ask, iv, |delta| and has-greeks columns of a packed block"""
+    base = COLUMNS.index(f"{side}_bid")
+    cols = {field: block[:, base + k] for k, field in enumerate(FIELDS)}
+    cols["greeks"] = cols["greeks"] > 0
+    cols["strike"] = block[:, 0]
+    return cols
+
+def short_index(cols, dte, stock_price, r, is_call):
+    """Positions of strikes eligible as the short leg, and their PoP
+
+    Delta band and PoP only depend on the short leg, so they are settled
+    here, before any pairing.
+    """
+    band = cols["greeks"] & (cols["delta"] >= MIN_SHORT_DELTA) & (cols["delta"] <= MAX_SHORT_DELTA)
+    shorts = np.flatnonzero(band)
+    pop = bs.pop(stock_price, cols["strike"][shorts], bs.years(dte), cols["iv"][shorts], r, is_call)
+    keep = pop >= MIN_POP
+    return shorts[keep], pop[keep]
+
+def long_windows(strike, shorts, is_call):
+    """[start, stop) of long-leg positions for each short, on the sorted strikes
+
+    Bull Puts buy below the short, Bear Calls above it; MAX_SPREAD_WIDTH
+    and MAX_SPREAD_STRIKES narrow the window with a bisect on the strikes.
+    """
+    if is_call:
+        start = shorts + 1
+        stop = np.full(len(shorts), len(strike))
+        if MAX_SPREAD_WIDTH is not None:
+            stop = np.minimum(stop, np.searchsorted(strike, strike[shorts] + MAX_SPREAD_WIDTH, side="right"))
+        if MAX_SPREAD_STRIKES is not None:
+            stop = np.minimum(stop, shorts + 1 + MAX_SPREAD_STRIKES)
+    else:
+        start = np.zeros(len(shorts), dtype=shorts.dtype)
+        stop = shorts
+        if MAX_SPREAD_WIDTH is not None:
+            start = np.maximum(start, np.searchsorted(strike, strike[shorts] - MAX_SPREAD_WIDTH, side="left"))
+        if MAX_SPREAD_STRIKES is not None:
+            start = np.maximum(start, shorts - MAX_SPREAD_STRIKES)
+    return start, np.maximum(stop, start)
+
+def candidate_pairs(cols, dte, stock_price, r, is_call):
+    """Indices (short, long) of every spread passing the filters, plus its metrics"""
+    shorts, short_pop = short_index(cols, dte, stock_price, r, is_call)
+    start, stop = long_windows(cols["strike"], shorts, is_call)
+
+    # Flatten the windows into one pair list, shorts ascending then longs ascending
+    counts = stop - start
+    short_idx = np.repeat(shorts, counts)
+    pop = np.repeat(short_pop, counts)
+    long_idx = np.repeat(start, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    credit = cols["bid"][short_idx] - cols["ask"][long_idx]
+    width = cols["strike"][long_idx] - cols["strike"][short_idx]
+    if not is_call:
+        width = -width
+    max_loss = width - credit
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = credit / max_loss * 100
+    mask = (cols["greeks"][long_idx] & (credit > MIN_CREDIT) & (width > 0)
+            & (roi >= MIN_ROI) & (roi <= MAX_ROI))
+
+    return (short_idx[mask], long_idx[mask], width[mask], credit[mask],
+            max_loss[mask], roi[mask], pop[mask])
+
+def expiration_records(block, dte, stock_price, r):
+    """Compact results for one packed expiration, one entry per side in SIDES
+
+    Each entry is (short_idx, long_idx, metrics) with metrics columns
+    width, credit, max_loss, roi, pop.
+    """
+    records = []
+    for side, _, is_call in SIDES:
+        short_idx, long_idx, width, credit, max_loss, roi, pop = candidate_pairs(
+            side_columns(block, side), dte, stock_price, r, is_call)
+        records.append((short_idx, long_idx, np.column_stack([width, credit, max_loss, roi, pop])))
+    return records
+
+def to_spreads(ticker, stock_price, expiration, dte, rows, records):
+    """Spread dicts for one expiration from its snapshot rows and expiration_records' output"""
+    strike = rows["strike"].tolist()
+    spreads = []
+    for (side, label, _), (short_idx, long_idx, metrics) in zip(SIDES, records):
+        iv, delta = rows[f"{side}_iv"].tolist(), rows[f"{side}_delta"].tolist()
+        for k in range(len(short_idx)):
+            short = short_idx[k]
+            width, credit, max_loss, roi, pop = metrics[k].tolist()
+            spreads.append({
+                "ticker": ticker,
+                "type": label,
+                "stock_price": round(stock_price, 2),
+                "short_strike": strike[short],
+                "long_strike": strike[long_idx[k]],
+                "width": round(width, 2),
+                "net_credit": round(credit, 2),
+                "max_loss": round(max_loss, 2),
+                "roi": round(roi, 1),
+                "pop": round(pop, 1),
+                "short_iv": round(iv[short] * 100, 1),
+                "short_delta": round(abs(delta[short]), 2),
+                "expiration": {"date": expiration, "dte": dte}
+            })
+    return spreads
+
+def spreads_for_expiration(ticker, stock_price, expiration, dte, rows, r):
+    """All Bull Put then Bear Call spreads for one expiration's snapshot rows, as spread dicts"""
+    return to_spreads(ticker, stock_price, expiration, dte, rows,
+                      expiration_records(pack(rows), dte, stock_price, r))
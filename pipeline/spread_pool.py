@@ -0,0 +1,68 @@
+"""
+Spread Pool - step 05's pair search spread across processes, sharded by ticker
+Every worker maps the same chain snapshot read-only and packs its own
+tickers' rows, so chains cross process boundaries without any pickling or
+copying; workers send back only the compact (short, long, metrics)
+records. Results are put back in job order, so the output matches a
+single-process run exactly.
+
+SPREAD_PROCESSES sets the pool size (default: every core); runs smaller
+than MIN_PARALLEL_ROWS strikes stay in-process, where start-up would
+cost more than it saves.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import snapshot, spread_engine
+
+PROCESSES = int(os.environ.get("SPREAD_PROCESSES", os.cpu_count() or 1))
+MIN_PARALLEL_ROWS = 250000  # ~1s of single-process pairing, about what spawning a pool costs
+SHARDS_PER_PROCESS = 4       # Smaller shards even out tickers with long chains
+
+def _records(records, job):
+    _, _, dte, start, stop, stock_price, r = job
+    return spread_engine.expiration_records(spread_engine.pack(records[start:stop]), dte, stock_price, r)
+
+def _worker(path, jobs):
+    """Run expiration_records for (job_id, job) pairs against the mapped snapshot"""
+    records = snapshot.load(path).records
+    return [(job_id, _records(records, job)) for job_id, job in jobs]
+
+def _shards(jobs, target_rows):
+    """Group jobs into shards of whole tickers, about target_rows strikes each"""
+    shards, current, rows, last_ticker = [], [], 0, None
+    for job_id, job in enumerate(jobs):
+        ticker, _, _, start, stop, _, _ = job
+        if ticker != last_ticker and rows >= target_rows:
+            shards.append(current)
+            current, rows = [], 0
+        current.append((job_id, job))
+        rows += stop - start
+        last_ticker = ticker
+    if current:
+        shards.append(current)
+    return shards
+
+def calculate(path, jobs, processes=None):
+    """expiration_records for each (ticker, expiration, dte, start, stop, stock_price, r) job, in job order
+
+    start/stop slice the records of the snapshot at path, as in its index.
+    """
+    processes = PROCESSES if processes is None else processes
+    total = sum(stop - start for _, _, _, start, stop, _, _ in jobs)
+    if processes <= 1 or total < MIN_PARALLEL_ROWS:
+        records = snapshot.load(path).records
+        return [_records(records, job) for job in jobs]
+
+    shards = _shards(jobs, total / (processes * SHARDS_PER_PROCESS))
+    results = [None] * len(jobs)
+    # spawn, not fork: the executor runs steps on threads
+    with ProcessPoolExecutor(max_workers=min(processes, len(shards)),
+                             mp_context=get_context("spawn")) as pool:
+        for done in [pool.submit(_worker, path, shard) for shard in shards]:
+            for job_id, records in done.result():
+                results[job_id] = records
+    return results
@@ -0,0 +1,84 @@
+"""
+Step Stamps - make-style incremental reruns
+A step's key hashes its code, its input artifacts and its parameters.
+Code is the step script plus every pipeline/ module it imports, directly
+or through another module, so editing a threshold in spread_engine.py or
+ranker.py reruns the steps that use it. If the key matches the last successful run and the outputs are still on
+disk, the step is skipped.
+"""
+import ast
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+STAMP_FILE = "data/.stamps.json"
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Steps that pull live data; their key also carries the date so they
+# refetch once per day (or when forced)
+NETWORK_STEPS = {"00a", "00b", "00c", "00d", "00f", "00g", "01", "02", "04", "08"}
+
+_lock = threading.Lock()
+
+def _pipeline_imports(path):
+    """Paths of the pipeline/ modules a file imports (at any depth in the file)"""
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "pipeline":
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith("pipeline."):
+            names.add(node.module.split(".")[1])
+        elif isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[1] for alias in node.names
+                         if alias.name.startswith("pipeline."))
+    paths = (os.path.join(PIPELINE_DIR, f"{name}.py") for name in names)
+    return {p for p in paths if os.path.exists(p)}
+
+def code_paths(script):
+    """script and every pipeline/ module it depends on, sorted after it"""
+    seen, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path not in seen:
+            seen.add(path)
+            todo.extend(_pipeline_imports(path) - seen)
+    return [script] + sorted(seen - {script})
+
+def step_key(step, code_paths, inputs, params=None):
+    """Hash code, input artifacts and parameters for one step"""
+    h = hashlib.sha256()
+    for path in list(code_paths) + list(inputs):
+        h.update(path.encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        else:
+            h.update(b"missing")
+    params = dict(params or {})
+    if step in NETWORK_STEPS:
+        params["date"] = datetime.now().date().isoformat()
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+def load_stamps():
+    try:
+        with open(STAMP_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def is_fresh(step, key, outputs):
+    """True if the last successful run had the same key and its outputs exist"""
+    return load_stamps().get(step) == key and all(os.path.exists(p) for p in outputs)
+
+def record(step, key):
+    """Remember the key of a successful run"""
+    with _lock:
+        stamps = load_stamps()
+        stamps[step] = key
+        with open(STAMP_FILE, "w") as f:
+            json.dump(stamps, f, indent=2)
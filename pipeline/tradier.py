@@ -0,0 +1,158 @@
+"""
+Tradier Client - one pooled HTTP session shared by every step
+Keeps TLS connections alive across calls, sets a deadline on every request,
+flattens Tradier's list-or-dict response shapes and decodes options and
+quotes into typed records (pipeline/payloads.py). Every request passes
+through one process-wide rate limiter, so all thread pools share the quota.
+"""
+import os
+import sys
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.config import TRADIER_TOKEN
+from pipeline.rate_limit import RateLimiter
+from pipeline import response_cache, cassette, payloads
+
+BASE_URL = os.environ.get("TRADIER_BASE_URL", "https://api.tradier.com")
+MAX_WORKERS = 10         # Thread-pool size for the fetching steps; also the pool size
+TIMEOUT = (3.05, 15)     # (connect, read) seconds
+RATE_LIMIT = 120         # Requests per minute until Tradier's headers say otherwise
+MAX_RETRIES = 3          # Retries after a 429
+
+limiter = RateLimiter(rate=RATE_LIMIT, per=60.0, max_concurrency=MAX_WORKERS)
+
+_session = None
+_session_lock = threading.Lock()
+
+class TradierError(Exception):
+    """Non-200 response or transport failure"""
+
+def session():
+    """Return the shared session, created on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update({
+                'Authorization': f'Bearer {TRADIER_TOKEN}',
+                'Accept': 'application/json',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive'
+            })
+            _session = s
+    return _session
+
+def request(method, path, params=None, data=None, timeout=TIMEOUT):
+    """Call a Tradier endpoint through the rate limiter, returns the raw response"""
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        resp = None
+        try:
+            resp = session().request(method, f'{BASE_URL}{path}', params=params, data=data, timeout=timeout)
+        finally:
+            limiter.release(resp)
+        if resp.status_code != 429:
+            break
+    return resp
+
+def get(path, params=None, timeout=TIMEOUT):
+    return request('GET', path, params=params, timeout=timeout)
+
+def _cassette_request(method, path, params, data):
+    """The cassette key for a request; quote symbols are sorted so caller order does not matter"""
+    if data and 'symbols' in data:
+        data = {**data, 'symbols': ','.join(sorted(data['symbols'].split(',')))}
+    return {'method': method, 'path': path, 'params': params, 'data': data}
+
+def get_json(path, params=None, timeout=TIMEOUT, data=None, seed=None):
+    """GET (or POST, when data is given) and decode, raises TradierError on failure
+
+    Goes through the record/replay cassette; seed is the cache file replay
+    falls back to.
+    """
+    method = 'POST' if data is not None else 'GET'
+
+    def fetch():
+        try:
+            resp = request(method, path, params=params, data=data, timeout=timeout)
+        except requests.RequestException as e:
+            raise TradierError(f"{path}: {e}") from e
+        if resp.status_code != 200:
+            raise TradierError(f"{path}: HTTP {resp.status_code} {resp.text[:100]}")
+        return resp.json()
+
+    try:
+        return cassette.call('tradier', _cassette_request(method, path, params, data), fetch, seed=seed)
+    except cassette.CassetteMiss as e:
+        raise TradierError(str(e)) from e
+
+def as_list(value):
+    """Tradier returns a dict for one item and a list for several"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _decode(decode, items):
+    try:
+        return decode(items)
+    except payloads.PayloadError as e:
+        raise TradierError(str(e)) from e
+
+def quotes(payload):
+    """List of payloads.Quote from a /v1/markets/quotes payload"""
+    data = (payload or {}).get('quotes') or {}
+    items = data if isinstance(data, list) else as_list(data.get('quote'))
+    return _decode(payloads.quotes, [q for q in items if q and 'symbol' in q])
+
+def options(payload):
+    """List of payloads.Option from a /v1/markets/options/chains payload"""
+    return _decode(payloads.options, as_list(((payload or {}).get('options') or {}).get('option')))
+
+def expiration_dates(payload):
+    """List of 'YYYY-MM-DD' strings from a /v1/markets/options/expirations payload"""
+    exp_data = (payload or {}).get('expirations')
+    if not exp_data:
+        return []
+    if isinstance(exp_data, dict):
+        return as_list(exp_data.get('date'))
+    return [e['date'] for e in exp_data]
+
+def fetch_quotes(symbols, greeks=False):
+    """Quotes for one batch; symbols go in a POST body so long lists fit"""
+    body = {'symbols': ','.join(symbols)}
+    if greeks:
+        body['greeks'] = 'true'
+    return quotes(get_json('/v1/markets/quotes', data=body))
+
+def fetch_expirations(ticker):
+    payload = response_cache.cached('expirations', ticker, 'exp', lambda: get_json(
+        '/v1/markets/options/expirations', {'symbol': ticker},
+        seed=response_cache.seed_path('expirations', ticker, 'exp')))
+    return expiration_dates(payload)
+
+def fetch_chain(ticker, expiration):
+    """Chain for one expiration, always with greeks so every stage can share it"""
+    params = {'symbol': ticker, 'expiration': expiration, 'greeks': 'true'}
+    payload = response_cache.cached('chain', ticker, expiration, lambda: get_json(
+        '/v1/markets/options/chains', params,
+        seed=response_cache.seed_path('chain', ticker, expiration)))
+    return options(payload)
+
+def greeks_record(opt):
+    """Rounded iv/delta/theta/gamma/vega from a Quote or Option, None without IV"""
+    greeks = opt.greeks
+    if greeks is None or greeks.mid_iv <= 0:
+        return None
+    return {
+        "iv": round(greeks.mid_iv, 4),
+        "delta": round(greeks.delta, 4),
+        "theta": round(greeks.theta, 4),
+        "gamma": round(greeks.gamma, 6),
+        "vega": round(greeks.vega, 4)
+    }
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Mock Tradier - local stand-in for the three market-data endpoints the pipeline uses
+Serves /v1/markets/quotes, /v1/markets/options/expirations and
+/v1/markets/options/chains in Tradier's response shapes, either from the
+payloads in data/.cache or from a synthetic universe of N tickers x M
+expirations x K strikes. Latency, throttling and X-Ratelimit-* headers are
+configurable so the fetch stages can be load-tested without a live account.
+
+    python utils/mock_tradier.py --source=synthetic --tickers=5000 --rate=120 --throttle=0.02
+    TRADIER_BASE_URL=http://127.0.0.1:8765 python run_full_pipeline.py
+
+Options (all --name=value):
+    --port=8765          listen port
+    --source=cache       cache | synthetic
+    --tickers=500        synthetic universe size
+    --expirations=8      weekly expirations per ticker
+    --strikes=40         strikes per expiration
+    --latency=0.05       seconds added to every response
+    --jitter=0.02        extra uniform random latency, seconds
+    --rate=120           requests allowed per --window, then 429 until it resets
+    --window=60          rate-limit window, seconds
+    --throttle=0         probability of injecting a 429 into any request
+    --universe           write the ticker list to data/sp500.json so step 00B uses it
+    --verbose            log every request
+"""
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts, response_cache
+
+DEFAULTS = {
+    "port": "8765",
+    "source": "cache",
+    "tickers": "500",
+    "expirations": "8",
+    "strikes": "40",
+    "latency": "0.05",
+    "jitter": "0.02",
+    "rate": "120",
+    "window": "60",
+    "throttle": "0",
+}
+
+RISK_FREE = 0.04
+
+def parse_args(argv):
+    options = dict(DEFAULTS)
+    for arg in argv:
+        if arg.startswith("--"):
+            name, _, value = arg[2:].partition("=")
+            options[name] = value or "true"
+    return options
+
+def seeded(*parts):
+    """Random generator that gives the same numbers for the same names"""
+    return random.Random(zlib.crc32("|".join(str(p) for p in parts).encode()))
+
+def norm_cdf(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+def norm_pdf(x):
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+def black_scholes(spot, strike, t, iv, is_call):
+    """Price and greeks (theta per day, vega per vol point)"""
+    t = max(t, 1 / 365)
+    d1 = (math.log(spot / strike) + (RISK_FREE + iv * iv / 2) * t) / (iv * math.sqrt(t))
+    d2 = d1 - iv * math.sqrt(t)
+    discount = math.exp(-RISK_FREE * t)
+    if is_call:
+        price = spot * norm_cdf(d1) - strike * discount * norm_cdf(d2)
+        delta = norm_cdf(d1)
+        theta = -spot * norm_pdf(d1) * iv / (2 * math.sqrt(t)) - RISK_FREE * strike * discount * norm_cdf(d2)
+    else:
+        price = strike * discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+        delta = norm_cdf(d1) - 1
+        theta = -spot * norm_pdf(d1) * iv / (2 * math.sqrt(t)) + RISK_FREE * strike * discount * norm_cdf(-d2)
+    return price, {
+        "delta": round(delta, 5),
+        "gamma": round(norm_pdf(d1) / (spot * iv * math.sqrt(t)), 5),
+        "theta": round(theta / 365, 5),
+        "vega": round(spot * norm_pdf(d1) * math.sqrt(t) / 100, 5),
+        "rho": 0.0,
+        "phi": 0.0,
+        "bid_iv": round(iv * 0.98, 5),
+        "mid_iv": round(iv, 5),
+        "ask_iv": round(iv * 1.02, 5),
+        "smv_vol": round(iv, 5),
+        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def occ_symbol(ticker, expiration, option_type, strike):
+    return f"{ticker}{expiration[2:4]}{expiration[5:7]}{expiration[8:10]}{option_type[0].upper()}{int(round(strike * 1000)):08d}"
+
+def parse_occ(symbol):
+    """(root, 'YYYY-MM-DD', 'call'/'put', strike) or None for a stock symbol"""
+    if len(symbol) < 16 or symbol[-9] not in "CP" or not symbol[-15:-9].isdigit():
+        return None
+    stamp = symbol[-15:-9]
+    return (symbol[:-15], f"20{stamp[:2]}-{stamp[2:4]}-{stamp[4:]}",
+            "call" if symbol[-9] == "C" else "put", int(symbol[-8:]) / 1000)
+
+def one_or_list(items):
+    """Tradier's shape: a dict for one item, a list for several, null for none"""
+    if not items:
+        return None
+    return items[0] if len(items) == 1 else items
+
+class Universe:
+    """Where the quotes, expirations and chains come from"""
+
+    def __init__(self, options):
+        self.source = options["source"]
+        self.n_tickers = int(options["tickers"])
+        self.n_expirations = int(options["expirations"])
+        self.n_strikes = int(options["strikes"])
+        self._chains = {}
+        self._lock = threading.Lock()
+
+    def tickers(self):
+        if self.source == "cache":
+            names = os.listdir(response_cache.SEED_DIR) if os.path.isdir(response_cache.SEED_DIR) else []
+            return sorted({n.split("__")[1] for n in names if n.startswith("expirations__")})
+        return [f"SY{i:04d}" for i in range(self.n_tickers)]
+
+    def _profile(self, ticker):
+        rng = seeded("profile", ticker)
+        return {"spot": round(rng.uniform(20, 500), 2), "iv": rng.uniform(0.15, 0.70)}
+
+    def _read_cache(self, kind, ticker, key):
+        try:
+            with open(response_cache.seed_path(kind, ticker, key), "r") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        payload.pop("_fetched_at", None)
+        return payload
+
+    def expirations(self, ticker):
+        if self.source == "cache":
+            return self._read_cache("expirations", ticker, "exp") or {"expirations": None}
+        if not ticker.startswith("SY"):
+            return {"expirations": None}
+        today = datetime.now().date()
+        friday = today + timedelta(days=(4 - today.weekday()) % 7 or 7)
+        dates = [(friday + timedelta(weeks=w)).isoformat() for w in range(self.n_expirations)]
+        return {"expirations": {"date": one_or_list(dates)}}
+
+    def chain(self, ticker, expiration, greeks):
+        if self.source == "cache":
+            payload = self._read_cache("chain", ticker, expiration) or {"options": None}
+            if not greeks:
+                options = (payload.get("options") or {}).get("option") or []
+                for opt in ([options] if isinstance(options, dict) else options):
+                    opt.pop("greeks", None)
+            return payload
+        if not ticker.startswith("SY"):
+            return {"options": None}
+        return {"options": {"option": one_or_list(
+            [dict(opt) if greeks else {k: v for k, v in opt.items() if k != "greeks"}
+             for opt in self._synthetic_chain(ticker, expiration)])}}
+
+    def _synthetic_chain(self, ticker, expiration):
+        key = (ticker, expiration)
+        with self._lock:
+            if key in self._chains:
+                return self._chains[key]
+
+        profile = self._profile(ticker)
+        spot, base_iv = profile["spot"], profile["iv"]
+        dte = (datetime.strptime(expiration, "%Y-%m-%d").date() - datetime.now().date()).days
+        t = max(dte, 1) / 365
+        step = 0.5 if spot < 25 else 1.0 if spot < 100 else 2.5 if spot < 250 else 5.0
+        center = round(spot / step) * step
+        strikes = [center + (i - self.n_strikes // 2) * step for i in range(self.n_strikes)]
+
+        rng = seeded("chain", ticker, expiration)
+        chain = []
+        for strike in strikes:
+            if strike <= 0:
+                continue
+            skew = base_iv * (1 + 0.3 * abs(math.log(strike / spot)))
+            for option_type in ("call", "put"):
+                price, greeks = black_scholes(spot, strike, t, skew, option_type == "call")
+                half = max(0.01, price * rng.uniform(0.01, 0.08))
+                bid = max(0.0, round(price - half, 2))
+                ask = round(price + half, 2)
+                chain.append({
+                    "symbol": occ_symbol(ticker, expiration, option_type, strike),
+                    "description": f"{ticker} {expiration} ${strike:.2f} {option_type.title()}",
+                    "type": "option",
+                    "last": round(price, 2),
+                    "volume": rng.randint(0, 5000),
+                    "bid": bid,
+                    "ask": ask,
+                    "underlying": ticker,
+                    "strike": strike,
+                    "bidsize": rng.randint(1, 200),
+                    "asksize": rng.randint(1, 200),
+                    "open_interest": rng.randint(0, 20000),
+                    "contract_size": 100,
+                    "expiration_date": expiration,
+                    "expiration_type": "weeklys",
+                    "option_type": option_type,
+                    "root_symbol": ticker,
+                    "greeks": greeks
+                })
+
+        with self._lock:
+            self._chains[key] = chain
+        return chain
+
+    def _spot_from_cache(self, ticker):
+        """Underlying price implied by put-call parity on the nearest cached chain"""
+        payload = self.expirations(ticker)
+        dates = (payload.get("expirations") or {}).get("date") or []
+        for expiration in ([dates] if isinstance(dates, str) else dates):
+            options = (self.chain(ticker, expiration, False).get("options") or {}).get("option") or []
+            pairs = {}
+            for opt in ([options] if isinstance(options, dict) else options):
+                mid = (float(opt.get("bid") or 0) + float(opt.get("ask") or 0)) / 2
+                pairs.setdefault(opt["strike"], {})[opt["option_type"]] = mid
+            both = [(k, p) for k, p in pairs.items() if "call" in p and "put" in p]
+            if both:
+                strike, mids = min(both, key=lambda kp: abs(kp[1]["call"] - kp[1]["put"]))
+                return round(strike + mids["call"] - mids["put"], 2)
+        return None
+
+    def quote(self, symbol, greeks):
+        occ = parse_occ(symbol)
+        if occ is None:
+            if self.source == "cache":
+                spot = self._spot_from_cache(symbol)
+                if spot is None:
+                    return None
+            elif symbol.startswith("SY"):
+                spot = self._profile(symbol)["spot"]
+            else:
+                return None
+            half = max(0.01, round(spot * 0.0002, 2))
+            return {"symbol": symbol, "description": symbol, "type": "stock",
+                    "last": spot, "bid": round(spot - half, 2), "ask": round(spot + half, 2),
+                    "bidsize": 5, "asksize": 5, "volume": 1000000}
+
+        root, expiration, option_type, strike = occ
+        options = (self.chain(root, expiration, greeks).get("options") or {}).get("option") or []
+        for opt in ([options] if isinstance(options, dict) else options):
+            if opt.get("symbol") == symbol:
+                return opt
+        return None
+
+class Throttle:
+    """Fixed-window request quota reported through X-Ratelimit-* headers"""
+
+    def __init__(self, rate, window, inject):
+        self.rate = rate
+        self.window = window
+        self.inject = inject
+        self.window_end = time.time() + window
+        self.used = 0
+        self.counts = {"requests": 0, "throttled": 0, "injected": 0}
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Returns (allowed, headers)"""
+        with self._lock:
+            now = time.time()
+            if now >= self.window_end:
+                self.window_end = now + self.window
+                self.used = 0
+            self.counts["requests"] += 1
+            allowed = self.used < self.rate
+            injected = allowed and random.random() < self.inject
+            if allowed and not injected:
+                self.used += 1
+            elif injected:
+                self.counts["injected"] += 1
+            else:
+                self.counts["throttled"] += 1
+            headers = {
+                "X-Ratelimit-Allowed": str(self.rate),
+                "X-Ratelimit-Used": str(self.used),
+                "X-Ratelimit-Available": str(self.rate - self.used),
+                "X-Ratelimit-Expiry": str(int(self.window_end * 1000)),
+            }
+            return allowed and not injected, headers
+
+def make_handler(universe, throttle, latency, jitter, verbose):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+        def _params(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                body = self.rfile.read(length).decode()
+                params.update({k: v[-1] for k, v in parse_qs(body).items()})
+            return url.path, params
+
+        def _send(self, status, payload, headers):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self):
+            path, params = self._params()
+            time.sleep(latency + random.uniform(0, jitter))
+            allowed, headers = throttle.check()
+            if not allowed:
+                self._send(429, {"fault": {"faultstring": "Rate limit exceeded"}}, headers)
+                return
+
+            greeks = params.get("greeks") == "true"
+            if path == "/v1/markets/quotes":
+                symbols = [s for s in params.get("symbols", "").split(",") if s]
+                found = [q for q in (universe.quote(s, greeks) for s in symbols) if q]
+                unmatched = [s for s in symbols if s not in {q["symbol"] for q in found}]
+                quotes = {"quote": one_or_list(found)}
+                if unmatched:
+                    quotes["unmatched_symbols"] = {"symbol": one_or_list(unmatched)}
+                self._send(200, {"quotes": quotes}, headers)
+            elif path == "/v1/markets/options/expirations":
+                self._send(200, universe.expirations(params.get("symbol", "")), headers)
+            elif path == "/v1/markets/options/chains":
+                self._send(200, universe.chain(params.get("symbol", ""), params.get("expiration", ""), greeks), headers)
+            else:
+                self._send(404, {"fault": {"faultstring": f"Unknown endpoint {path}"}}, headers)
+
+        do_GET = _handle
+        do_POST = _handle
+
+    return Handler
+
+def main():
+    options = parse_args(sys.argv[1:])
+    universe = Universe(options)
+    throttle = Throttle(int(options["rate"]), float(options["window"]), float(options["throttle"]))
+
+    print("="*60)
+    print("MOCK TRADIER")
+    print("="*60)
+    tickers = universe.tickers()
+    print(f"Source: {options['source']} ({len(tickers)} tickers)")
+    if options["source"] == "synthetic":
+        print(f"Chains: {options['expirations']} expirations x {options['strikes']} strikes")
+    print(f"Latency: {options['latency']}s + up to {options['jitter']}s")
+    print(f"Quota: {options['rate']} requests / {options['window']}s, {float(options['throttle'])*100:.1f}% injected 429s")
+
+    if options.get("universe") == "true":
+        artifacts.save("data/sp500.json", {
+            "timestamp": datetime.now().isoformat(),
+            "count": len(tickers),
+            "tickers": tickers
+        })
+        print(f"📝 Wrote {len(tickers)} tickers to data/sp500.json")
+
+    handler = make_handler(universe, throttle, float(options["latency"]), float(options["jitter"]),
+                           options.get("verbose") == "true")
+    server = ThreadingHTTPServer(("127.0.0.1", int(options["port"])), handler)
+    server.daemon_threads = True
+    print(f"\n🚀 Listening on http://127.0.0.1:{options['port']}")
+    print(f"   TRADIER_BASE_URL=http://127.0.0.1:{options['port']} python run_full_pipeline.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        counts = throttle.counts
+        print(f"\n📊 {counts['requests']} requests, {counts['throttled']} over quota, {counts['injected']} injected 429s")
+
+if __name__ == "__main__":
+    main()
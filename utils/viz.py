@@ -7,19 +7,22 @@ import pandas as pd
 import plotly.express as px
 import json
 import os
+import sys
 from datetime import datetime
 from st_aggrid import AgGrid, GridOptionsBuilder
 import pyperclip
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import artifacts
+
 st.set_page_config(page_title="Spread Command Center", layout="wide")
 
 
 @st.cache_data
 def load_data():
-    """Load spreads.json, latest top9 CSV, and report_table.json"""
+    """Load spreads.npz, latest top9 CSV, and report_table.json"""
     try:
-        with open("data/spreads.json", "r") as f:
-            spreads = json.load(f)['spreads']
+        spreads = artifacts.load("data/spreads.npz")['spreads']
         df_spreads = pd.DataFrame(spreads)
 
         latest_csv = max([f for f in os.listdir('reports') if f.endswith('.csv')],